@@ -1,14 +1,39 @@
+import queue
+import threading
+import time
 import tkinter as tk
-from tkinter import ttk, messagebox, simpledialog
+from tkinter import ttk, messagebox, simpledialog, filedialog
+from attendance_export import detect_format, export_attendance
+from attendance_sink import students_changed
 from database import AttendanceDatabase
+from paged_tree import PagedTreeview
 from datetime import datetime
 
 class AdminDashboard:
+    SEARCH_DELAY_MS = 250
+    
     def __init__(self, root, main_app=None):
         self.root = root
         self.main_app = main_app
         self.db = AttendanceDatabase()
         
+        # Search runs on its own thread (and connection); results come back through a queue
+        self.search_query = ''
+        self.search_status = None
+        self._search_after = None
+        self._search_seq = 0
+        self._search_polling = False
+        self._closed = False
+        self._search_requests = queue.Queue()
+        self._search_results = queue.Queue()
+        self._search_thread = threading.Thread(target=self._search_loop, name="student-search", daemon=True)
+        self._search_thread.start()
+        
+        # Background export state
+        self._export_thread = None
+        self._export_cancel = False
+        self._export_events = queue.Queue()
+        
         self.root.title("Admin Dashboard")
         self.root.geometry("1000x700")
         self.root.configure(bg='#2c3e50')
@@ -39,6 +64,23 @@ class AdminDashboard:
                              font=("Arial", 12, "bold"), bg='#2c3e50', fg='white')
         list_label.pack(anchor='w', pady=(0, 5))
         
+        # Search by name, student ID or email, optionally filtered by status
+        search_frame = tk.Frame(left_frame, bg='#2c3e50')
+        search_frame.pack(fill=tk.X, pady=(0, 5))
+        
+        tk.Label(search_frame, text="Search:", font=("Arial", 10), 
+                bg='#2c3e50', fg='white').pack(side=tk.LEFT)
+        self.search_var = tk.StringVar()
+        self.search_var.trace_add('write', self.on_search_changed)
+        search_entry = tk.Entry(search_frame, textvariable=self.search_var, font=("Arial", 10))
+        search_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        
+        self.status_filter = ttk.Combobox(search_frame, values=("All", "active", "inactive"), 
+                                          state='readonly', width=10)
+        self.status_filter.set("All")
+        self.status_filter.bind('<<ComboboxSelected>>', self.on_search_changed)
+        self.status_filter.pack(side=tk.LEFT)
+        
         # Treeview frame
         tree_frame = tk.Frame(left_frame, bg='#34495e', relief=tk.RAISED, borderwidth=2)
         tree_frame.pack(fill=tk.BOTH, expand=True)
@@ -64,6 +106,11 @@ class AdminDashboard:
         
         self.tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         
+        # Students are fetched a page at a time as the list is scrolled
+        self.students = PagedTreeview(self.tree, scrollbar, self.fetch_students,
+                                      cursor_of=lambda row: row[1], row_item=self.student_item,
+                                      empty_values=("No students", "", "", ""))
+        
         # Bind selection
         self.tree.bind('<<TreeviewSelect>>', self.on_student_select)
         
@@ -128,10 +175,24 @@ class AdminDashboard:
         
         refresh_btn = tk.Button(bottom_frame, text="🔄 Refresh", 
                                font=("Arial", 9, "bold"), bg='#95a5a6', 
-                               fg='white', command=self.load_students,
+                               fg='white', command=self.refresh_students,
                                cursor='hand2')
         refresh_btn.pack(pady=5, fill=tk.X)
         
+        self.export_btn = tk.Button(bottom_frame, text="📤 Export Attendance", 
+                                    font=("Arial", 9, "bold"), bg='#16a085', 
+                                    fg='white', command=self.export_attendance,
+                                    cursor='hand2')
+        self.export_btn.pack(pady=5, fill=tk.X)
+        
+        self.export_progress = ttk.Progressbar(bottom_frame, mode='determinate')
+        
+        totals_btn = tk.Button(bottom_frame, text="📊 Attendance Totals", 
+                              font=("Arial", 9, "bold"), bg='#8e44ad', 
+                              fg='white', command=self.show_attendance_totals,
+                              cursor='hand2')
+        totals_btn.pack(pady=5, fill=tk.X)
+        
         back_btn = tk.Button(bottom_frame, text="← Back to Main", 
                             font=("Arial", 9, "bold"), bg='#7f8c8d', 
                             fg='white', command=self.go_back,
@@ -144,23 +205,127 @@ class AdminDashboard:
                                     fg='#2ecc71')
         self.status_label.pack(pady=10)
     
-    def load_students(self):
-        """Load all students into treeview"""
-        # Clear existing items
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+    def show_attendance_totals(self):
+        """Show present/late/absent totals and attendance rate for every student"""
+        # One query over the trigger-maintained summary table, however many students there are
+        rows = list(enumerate(self.db.get_attendance_summaries()))
         
-        # Get all students
-        students = self.db.get_all_students()
+        window = tk.Toplevel(self.root)
+        window.title("Attendance Totals")
+        window.geometry("700x500")
+        window.configure(bg='#2c3e50')
         
-        if not students:
-            self.tree.insert("", "end", text="", 
-                           values=("No students", "", "", ""))
-        else:
-            for student_id, name, email, student_id_num, status, created_at in students:
-                self.tree.insert("", "end", text="", 
-                               values=(name, email or "N/A", student_id_num or "N/A", status),
-                               tags=(student_id,))
+        tk.Label(window, text=f"Attendance Totals ({len(rows)} students)", 
+                font=("Arial", 14, "bold"), bg='#2c3e50', fg='white').pack(pady=10)
+        
+        frame = tk.Frame(window, bg='#34495e', relief=tk.RAISED, borderwidth=2)
+        frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=(0, 20))
+        
+        scrollbar = ttk.Scrollbar(frame)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        
+        columns = ("Name", "ID", "Present", "Late", "Absent", "Total", "Rate")
+        tree = ttk.Treeview(frame, columns=columns, show='headings', yscrollcommand=scrollbar.set)
+        scrollbar.config(command=tree.yview)
+        for column in columns:
+            anchor = tk.W if column in ("Name", "ID") else tk.CENTER
+            tree.column(column, anchor=anchor, width=150 if column == "Name" else 80)
+            tree.heading(column, text="Student ID" if column == "ID" else column, anchor=anchor)
+        tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        
+        def row_item(row):
+            _, (student_id, name, student_id_num, present, absent, late, total, rate) = row
+            return (str(student_id), (name, student_id_num or "N/A", present, late, absent, total,
+                                      f"{rate:.0%}"), ())
+        
+        # The rows are already in memory; the tree still only gets a page at a time
+        window.totals = PagedTreeview(tree, scrollbar,
+                                      lambda after, limit: rows[after or 0:(after or 0) + limit],
+                                      cursor_of=lambda row: row[0] + 1, row_item=row_item,
+                                      empty_values=("No students", "", "", "", "", "", ""))
+        window.totals.load_more()
+    
+    @staticmethod
+    def student_item(row):
+        """Treeview (iid, values, tags) for a student row"""
+        student_id, name, email, student_id_num, status, created_at = row
+        return (str(student_id), (name, email or "N/A", student_id_num or "N/A", status), (student_id,))
+    
+    def load_students(self):
+        """Load the first page of students into treeview"""
+        self.students.reload()
+    
+    def refresh_students(self):
+        """Update the loaded students in place"""
+        self.students.refresh()
+    
+    def fetch_students(self, after, limit):
+        """One page of students matching the current search"""
+        return self.db.search_students(self.search_query, self.search_status, after, limit)
+    
+    def on_search_changed(self, *args):
+        """Debounce typing: search once the user pauses"""
+        if self._search_after is not None:
+            self.root.after_cancel(self._search_after)
+        self._search_after = self.root.after(self.SEARCH_DELAY_MS, self.start_search)
+    
+    def start_search(self):
+        self._search_after = None
+        status = self.status_filter.get()
+        self._search_seq += 1
+        self._search_requests.put((self._search_seq, self.search_var.get().strip(),
+                                   None if status == "All" else status))
+        if not self._search_polling:
+            self._search_polling = True
+            self.poll_search()
+    
+    def _search_loop(self):
+        """Search thread: serve the newest request, skipping ones typed over meanwhile"""
+        while True:
+            request = self._search_requests.get()
+            while request is not None:
+                try:
+                    request = self._search_requests.get_nowait()
+                except queue.Empty:
+                    break
+            if request is None:
+                return
+            
+            seq, query, status = request
+            start = time.perf_counter()
+            try:
+                rows = self.db.search_students(query, status, limit=self.students.page_size)
+                error = None
+            except Exception as e:
+                rows, error = [], str(e)
+            self._search_results.put((seq, query, status, rows, error, time.perf_counter() - start))
+    
+    def poll_search(self):
+        """Show the result of the latest search once the search thread has it"""
+        if self._closed:
+            return
+        result = None
+        while True:
+            try:
+                item = self._search_results.get_nowait()
+            except queue.Empty:
+                break
+            if item[0] == self._search_seq:
+                result = item
+        if result is None:
+            self.root.after(30, self.poll_search)
+            return
+        
+        self._search_polling = False
+        seq, query, status, rows, error, seconds = result
+        if error:
+            self.status_label.config(text=f"Search failed: {error}", fg='#e74c3c')
+            return
+        self.search_query = query
+        self.search_status = status
+        self.students.show(rows)
+        more = "+" if len(rows) == self.students.page_size else ""
+        self.status_label.config(text=f"{len(rows)}{more} students found ({seconds * 1000:.0f} ms)", fg='#2ecc71')
     
     def on_student_select(self, event):
         """Handle student selection"""
@@ -185,11 +350,12 @@ class AdminDashboard:
         success, result = self.db.add_student(name, email, student_id)
         
         if success:
+            students_changed()
             messagebox.showinfo("Success", f"Student '{name}' added successfully!")
             self.name_entry.delete(0, tk.END)
             self.email_entry.delete(0, tk.END)
             self.id_entry.delete(0, tk.END)
-            self.load_students()
+            self.refresh_students()
             self.status_label.config(text="Student added successfully")
         else:
             messagebox.showerror("Error", f"Failed to add student: {result}")
@@ -235,14 +401,109 @@ class AdminDashboard:
             success, message = self.db.delete_student(int(student_id))
             
             if success:
+                # Recognized names must not keep resolving to the deleted id
+                students_changed()
                 messagebox.showinfo("Success", message)
-                self.load_students()
+                self.refresh_students()
                 self.status_label.config(text="Student deleted successfully")
             else:
                 messagebox.showerror("Error", f"Failed to delete student: {message}")
                 self.status_label.config(text="Failed to delete", fg='#e74c3c')
     
+    def export_attendance(self):
+        """Export the selected students' attendance (everyone if none is selected) in the background"""
+        if self._export_thread is not None:
+            # The button cancels a running export
+            self._export_cancel = True
+            return
+        
+        path = filedialog.asksaveasfilename(
+            parent=self.root, title="Export Attendance", defaultextension=".csv",
+            initialfile=f"Attendance_{datetime.now().strftime('%Y%m%d')}.csv",
+            filetypes=[("CSV", "*.csv"), ("CSV (gzip)", "*.csv.gz"), ("JSON Lines", "*.jsonl"),
+                       ("JSON Lines (gzip)", "*.jsonl.gz"), ("Parquet", "*.parquet"), ("Arrow", "*.arrow")])
+        if not path:
+            return
+        try:
+            detect_format(path)
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
+            return
+        
+        start_date = simpledialog.askstring("Export Attendance", "From date (YYYY-MM-DD, blank for all):",
+                                            parent=self.root)
+        if start_date is None:
+            return
+        end_date = simpledialog.askstring("Export Attendance", "To date (YYYY-MM-DD, blank for all):",
+                                          parent=self.root)
+        if end_date is None:
+            return
+        
+        student_ids = [int(self.tree.item(iid)['tags'][0]) for iid in self.tree.selection()
+                       if self.tree.item(iid)['tags']] or None
+        
+        self._export_cancel = False
+        self._export_thread = threading.Thread(
+            target=self._export_worker, args=(path, start_date.strip() or None, end_date.strip() or None, student_ids),
+            name="attendance-export", daemon=True)
+        self._export_thread.start()
+        self.export_btn.config(text="✖ Cancel Export")
+        self.export_progress['value'] = 0
+        self.export_progress.pack(pady=5, fill=tk.X, before=self.export_btn)
+        self.status_label.config(text="Exporting...", fg='#2ecc71')
+        self.poll_export()
+    
+    def _export_worker(self, path, start_date, end_date, student_ids):
+        """Export thread: stream the rows on its own connection and report progress"""
+        try:
+            with AttendanceDatabase(self.db.db_path) as db:
+                result = export_attendance(
+                    db, path, start_date=start_date, end_date=end_date, student_ids=student_ids,
+                    progress=lambda done, total: self._export_events.put(('progress', (done, total))),
+                    cancel=lambda: self._export_cancel)
+            self._export_events.put(('done', result))
+        except InterruptedError:
+            self._export_events.put(('cancelled', None))
+        except Exception as e:
+            self._export_events.put(('error', str(e)))
+    
+    def poll_export(self):
+        """Show export progress on the Tk thread until the export thread finishes"""
+        if self._closed:
+            return
+        while True:
+            try:
+                kind, payload = self._export_events.get_nowait()
+            except queue.Empty:
+                break
+            if kind == 'progress':
+                done, total = payload
+                self.export_progress['value'] = done / total * 100 if total else 100
+                self.status_label.config(text=f"Exported {done}/{total} records")
+                continue
+            
+            self._export_thread = None
+            self.export_btn.config(text="📤 Export Attendance")
+            self.export_progress.pack_forget()
+            if kind == 'done':
+                self.status_label.config(text=f"Exported {payload['rows']} records", fg='#2ecc71')
+                messagebox.showinfo("Success", f"Exported {payload['rows']} records to {payload['path']}\n"
+                                               f"({payload['seconds']:.1f}s)")
+            elif kind == 'cancelled':
+                self.status_label.config(text="Export cancelled", fg='#e74c3c')
+            else:
+                self.status_label.config(text="Export failed", fg='#e74c3c')
+                messagebox.showerror("Error", f"Failed to export: {payload}")
+            return
+        self.root.after(100, self.poll_export)
+    
     def go_back(self):
+        self._closed = True
+        self._export_cancel = True
+        if self._search_after is not None:
+            self.root.after_cancel(self._search_after)
+        self._search_requests.put(None)
+        self._search_thread.join(timeout=1.0)
         self.db.close()
         self.root.destroy()
         if self.main_app:
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Attendance Export
+Streams attendance records for any date range and set of students to CSV,
+JSON Lines, Parquet or Arrow. Rows are read in fetchmany batches and written
+as they arrive, so memory use does not grow with the size of the export.
+
+Usage:
+    python attendance_export.py attendance.csv.gz [--from 2025-09-01] [--to 2025-12-19]
+                                [--student josh --student S-0042] [--format csv|jsonl|parquet|arrow]
+
+The format is taken from the file name unless --format is given; a .gz
+suffix compresses CSV and JSON Lines. Parquet and Arrow need pyarrow.
+"""
+
+import argparse
+import csv
+import gzip
+import io
+import json
+import os
+import time
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+from database import AttendanceDatabase
+
+COLUMNS = ('date', 'time_in', 'status', 'name', 'student_id', 'email')
+FORMATS = {'.csv': 'csv', '.jsonl': 'jsonl', '.parquet': 'parquet', '.arrow': 'arrow', '.feather': 'arrow'}
+
+
+def detect_format(path):
+    """Return (format, gzip) from a file name such as export.jsonl.gz"""
+    root, ext = os.path.splitext(path.lower())
+    compressed = ext == '.gz'
+    if compressed:
+        ext = os.path.splitext(root)[1]
+    if ext not in FORMATS:
+        raise ValueError(f"Cannot tell the export format from {path!r}; use .csv, .jsonl, .parquet or .arrow")
+    return FORMATS[ext], compressed
+
+
+class _TextWriter:
+    def __init__(self, path, compressed):
+        if compressed:
+            self.file = io.TextIOWrapper(gzip.open(path, 'wb'), encoding='utf-8', newline='')
+        else:
+            self.file = open(path, 'w', encoding='utf-8', newline='')
+    
+    def close(self):
+        self.file.close()
+
+
+class _CsvWriter(_TextWriter):
+    def __init__(self, path, compressed):
+        super().__init__(path, compressed)
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(COLUMNS)
+    
+    def write(self, rows):
+        self.writer.writerows(rows)
+
+
+class _JsonlWriter(_TextWriter):
+    def write(self, rows):
+        self.file.write(''.join(json.dumps(dict(zip(COLUMNS, row))) + '\n' for row in rows))
+
+
+class _ArrowWriter:
+    """Parquet (one row group per batch) or Arrow IPC file"""
+    
+    def __init__(self, path, parquet, compressed):
+        if pa is None:
+            raise ValueError("Parquet and Arrow export need pyarrow (pip install pyarrow)")
+        self.schema = pa.schema([(column, pa.string()) for column in COLUMNS])
+        if parquet:
+            self.writer = pq.ParquetWriter(path, self.schema, compression='gzip' if compressed else 'snappy')
+        else:
+            if compressed:
+                raise ValueError("Arrow files support zstd or lz4 compression, not gzip")
+            self.writer = pa.ipc.new_file(path, self.schema)
+    
+    def write(self, rows):
+        columns = [[None if value is None else str(value) for value in column] for column in zip(*rows)]
+        self.writer.write_batch(pa.record_batch(columns, schema=self.schema))
+    
+    def close(self):
+        self.writer.close()
+
+
+def open_writer(path, fmt, compressed):
+    if fmt == 'csv':
+        return _CsvWriter(path, compressed)
+    if fmt == 'jsonl':
+        return _JsonlWriter(path, compressed)
+    if fmt in ('parquet', 'arrow'):
+        return _ArrowWriter(path, fmt == 'parquet', compressed)
+    raise ValueError(f"Unknown export format {fmt!r}")
+
+
+def export_attendance(db, path, fmt=None, compressed=None, start_date=None, end_date=None,
+                      student_ids=None, batch_size=5000, progress=None, cancel=None):
+    """Write matching attendance records to path. Returns a stats dict.
+    
+    progress(done, total) is called after every batch; cancel() returning
+    True stops the export. The file is written under a temporary name and
+    renamed when complete, so a failed or cancelled export leaves nothing.
+    """
+    if fmt is None:
+        fmt, detected = detect_format(path)
+        compressed = detected if compressed is None else compressed
+    compressed = bool(compressed)
+    
+    start = time.perf_counter()
+    total = db.count_attendance(start_date, end_date, student_ids)
+    tmp_path = path + '.part'
+    writer = open_writer(tmp_path, fmt, compressed)
+    batches = db.iter_attendance(start_date, end_date, student_ids, batch_size)
+    done = 0
+    try:
+        for rows in batches:
+            if cancel and cancel():
+                raise InterruptedError("Export cancelled")
+            writer.write(rows)
+            done += len(rows)
+            if progress:
+                progress(done, total)
+        writer.close()
+        os.replace(tmp_path, path)
+    except BaseException:
+        writer.close()
+        os.remove(tmp_path)
+        raise
+    finally:
+        batches.close()
+    
+    return {
+        'path': path,
+        'format': fmt,
+        'rows': done,
+        'bytes': os.path.getsize(path),
+        'seconds': time.perf_counter() - start,
+    }
+
+
+def resolve_students(db, names):
+    """Map names or student ID numbers to database ids"""
+    ids = []
+    for value in names:
+        student = db.get_student_by_name_nocase(value)
+        if student is None:
+            db.cursor.execute('SELECT id FROM students WHERE student_id = ?', (value,))
+            student = db.cursor.fetchone()
+        if student is None:
+            raise ValueError(f"No student named or numbered {value!r}")
+        ids.append(student[0])
+    return ids
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export attendance records")
+    parser.add_argument('output', help="Output file; .csv, .jsonl, .parquet or .arrow, optionally + .gz")
+    parser.add_argument('--format', choices=['csv', 'jsonl', 'parquet', 'arrow'], help="Override the format from the file name")
+    parser.add_argument('--gzip', action='store_true', help="Compress (implied by a .gz file name)")
+    parser.add_argument('--from', dest='start_date', help="First date, YYYY-MM-DD")
+    parser.add_argument('--to', dest='end_date', help="Last date, YYYY-MM-DD")
+    parser.add_argument('--student', action='append', help="Name or student ID to include (repeatable; default: everyone)")
+    parser.add_argument('--db', default='attendance.db', help="Database file (default: attendance.db)")
+    parser.add_argument('--batch-size', type=int, default=5000, help="Rows fetched per batch")
+    args = parser.parse_args(argv)
+    
+    def report(done, total):
+        print(f"\r{done}/{total} rows", end='', flush=True)
+    
+    with AttendanceDatabase(args.db) as db:
+        try:
+            student_ids = resolve_students(db, args.student) if args.student else None
+            compressed = args.gzip or args.output.lower().endswith('.gz')
+            result = export_attendance(db, args.output, args.format, compressed, args.start_date, args.end_date,
+                                       student_ids, args.batch_size, report)
+        except ValueError as e:
+            print(f"Error: {e}")
+            return 1
+    print(f"\nExported {result['rows']} rows to {result['path']} "
+          f"({result['bytes'] / 1024:.0f} KB, {result['seconds']:.2f}s)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,137 @@
+import os
+import threading
+from datetime import datetime
+
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+    import fcntl
+
+
+def _lock_file(f):
+    if msvcrt:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+    else:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+
+
+def _unlock_file(f):
+    if msvcrt:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+    else:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+class DailyLedger:
+    """In-memory index of the day's Attendance_<date>.csv marks.
+
+    The day's file is read once when it is opened; after that only lines
+    appended by other processes are read, under a file lock, right before a
+    new mark is written. New marks go through a single append handle that
+    is flushed after each write. The ledger rolls over to a new file when
+    the date changes.
+    """
+
+    HEADER = "Name,Date,Time\n"
+
+    def __init__(self, directory='.', prefix='Attendance_'):
+        self.directory = directory
+        self.prefix = prefix
+        self.date = None
+        self.marked = set()
+        self._file = None
+        self._offset = 0
+        self._lock = threading.Lock()
+
+    def path_for(self, date):
+        return os.path.join(self.directory, f"{self.prefix}{date}.csv")
+
+    def _ensure_date(self, date=None):
+        """Switch to the file for date (default: today)"""
+        date = date or datetime.now().strftime("%Y-%m-%d")
+        if date != self.date:
+            self._close_file()
+            self._open(date)
+
+    def _open(self, date):
+        self.date = date
+        self.marked = set()
+        self._offset = 0
+        self._file = open(self.path_for(date), 'a+b')
+
+        _lock_file(self._file)
+        try:
+            self._file.seek(0, os.SEEK_END)
+            if self._file.tell() == 0:
+                self._file.write(self.HEADER.encode('utf-8'))
+                self._file.flush()
+            self._sync()
+        finally:
+            _unlock_file(self._file)
+
+    def _sync(self):
+        """Read lines appended since the last sync (caller holds the file lock)"""
+        self._file.seek(self._offset)
+        while True:
+            line = self._file.readline()
+            if not line.endswith(b"\n"):
+                break
+            self._offset += len(line)
+            name = line.decode('utf-8', errors='replace').split(',')[0].strip()
+            if name and name != "Name":
+                self.marked.add(name)
+
+    def is_marked(self, name):
+        """Check the in-memory index for a mark today"""
+        with self._lock:
+            self._ensure_date()
+            return name in self.marked
+
+    def mark(self, name, when=None):
+        """Append a mark for name. Returns False if already marked that day"""
+        now = when or datetime.now()
+        with self._lock:
+            # A mark for an earlier time (e.g. a recorded video) goes into that day's file
+            self._ensure_date(now.strftime('%Y-%m-%d'))
+            if name in self.marked:
+                return False
+
+            _lock_file(self._file)
+            try:
+                # Pick up marks written by other processes since our last read
+                self._sync()
+                if name in self.marked:
+                    return False
+
+                line = f"{name},{now.strftime('%Y-%m-%d')},{now.strftime('%H:%M:%S')}\n"
+                self._file.seek(0, os.SEEK_END)
+                self._file.write(line.encode('utf-8'))
+                self._file.flush()
+                self._offset = self._file.tell()
+                self.marked.add(name)
+                return True
+            finally:
+                _unlock_file(self._file)
+
+    def __contains__(self, name):
+        return self.is_marked(name)
+
+    def __len__(self):
+        with self._lock:
+            self._ensure_date()
+            return len(self.marked)
+
+    def _close_file(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def close(self):
+        """Close the day's file handle"""
+        with self._lock:
+            self._close_file()
+            self.date = None
+            self.marked = set()
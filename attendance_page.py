@@ -1,12 +1,17 @@
 import cv2
 import numpy as np
 import os
-import pickle
 from datetime import datetime
 import tkinter as tk
 from tkinter import ttk, messagebox
-from PIL import Image, ImageTk
 from database import AttendanceDatabase
+from face_model import get_model_holder
+from face_detector import DetectionScheduler
+from frame_recognizer import FrameRecognizer
+from frame_display import FrameDisplay
+from frame_pipeline import FramePipeline
+from perf_monitor import get_perf_monitor
+from attendance_sink import get_attendance_sink
 
 class AttendancePage:
     def __init__(self, root, main_app=None):
@@ -18,18 +23,28 @@ class AttendancePage:
         
         # Variables
         self.camera_active = False
-        self.cap = None
+        self.pipeline = None
         self.detected_person = None
+        self.detected_people = []
         self.detected_confidence = 100
         self.db = AttendanceDatabase()
+        self.model = get_model_holder()
+        self.sink = get_attendance_sink()
         
         # Face cascade
         self.face_cascade = cv2.CascadeClassifier(
             cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
         )
+        self.detector = DetectionScheduler(self.face_cascade)
+        self.recognizer = FrameRecognizer(self.model, self.detector)
         
         self.create_widgets()
         
+        # F2 toggles the performance overlay, F3 profiles the frame worker for 10 seconds
+        self.perf = get_perf_monitor()
+        self.root.bind('<F2>', lambda event: self.perf.toggle_overlay())
+        self.root.bind('<F3>', lambda event: self.perf.request_profile(10.0))
+        
         # Show instructions
         messagebox.showinfo("Instructions", 
             "ATTENDANCE PAGE\n\n"
@@ -59,6 +74,7 @@ class AttendancePage:
         camera_label.pack(pady=10)
         
         self.video_label = tk.Label(left_frame, bg='black')
+        self.display = FrameDisplay(self.video_label)
         self.video_label.pack(padx=10, pady=10, fill=tk.BOTH, expand=True)
         
         # Status label
@@ -158,11 +174,13 @@ class AttendancePage:
             return
         
         self.camera_active = True
-        self.cap = cv2.VideoCapture(0)
+        self.pipeline = FramePipeline(0, detect=self.detector, process=self.process_frame)
+        self.recognizer.reset()
         
-        if not self.cap.isOpened():
+        if not self.pipeline.start():
             messagebox.showerror("Error", "Could not open camera!")
             self.camera_active = False
+            self.pipeline = None
             return
         
         self.status_label.config(text="Camera Active", fg='#2ecc71')
@@ -173,148 +191,171 @@ class AttendancePage:
     
     def stop_camera(self):
         self.camera_active = False
-        if self.cap:
-            self.cap.release()
+        if self.pipeline:
+            self.pipeline.stop()
+            self.pipeline = None
         
         self.video_label.config(image='', bg='black')
+        self.display.clear()
         self.status_label.config(text="Camera Off", fg='#e74c3c')
         self.start_btn.config(state=tk.NORMAL)
         self.stop_btn.config(state=tk.DISABLED)
         self.accept_btn.config(state=tk.DISABLED)
     
     def update_frame(self):
+        """Display the newest processed frame (runs on the Tk thread)"""
         if not self.camera_active:
             return
         
-        ret, frame = self.cap.read()
-        if not ret:
+        self.pipeline.run_ui_callbacks()
+        
+        if self.pipeline.failed:
             self.stop_camera()
             return
         
-        frame = cv2.flip(frame, 1)
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        faces = self.face_cascade.detectMultiScale(gray, 1.3, 5)
-        
-        self.process_frame(frame, gray, faces)
-        
-        # Convert frame for display
-        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        frame = cv2.resize(frame, (640, 480))
-        img = Image.fromarray(frame)
-        imgtk = ImageTk.PhotoImage(image=img)
-        
-        self.video_label.imgtk = imgtk
-        self.video_label.configure(image=imgtk)
+        frame = self.pipeline.get_latest()
+        if frame is not None:
+            with self.perf.stage('photoimage'):
+                self.display.show(frame)
         
         if self.camera_active:
-            self.video_label.after(10, self.update_frame)
+            self.video_label.after(self.display.next_delay(), self.update_frame)
     
-    def process_frame(self, frame, gray, faces):
-        if len(faces) == 0:
-            self.detected_person = None
-            self.person_name_label.config(text="Not Detected", fg='#e74c3c')
-            self.confidence_label.config(text="0%")
-            self.accept_btn.config(state=tk.DISABLED)
-            cv2.putText(frame, "No Face Detected", (20, 40),
-                       cv2.FONT_HERSHEY_SIMPLEX, 1.0, (0, 0, 255), 3)
+    def show_detection(self, name_text, name_color, confidence_text, accept_state):
+        """Update the detected person panel (runs on the Tk thread)"""
+        if not self.camera_active:
             return
-        
-        # Load recognizer
+        self.person_name_label.config(text=name_text, fg=name_color)
+        self.confidence_label.config(text=confidence_text)
+        self.accept_btn.config(state=accept_state)
+    
+    def process_frame(self, frame, gray, faces):
+        """Recognize faces on the pipeline worker thread"""
         try:
-            recognizer = cv2.face.LBPHFaceRecognizer_create()
-            recognizer.read('face_recognizer.yml')
-            
-            with open('labels.pkl', 'rb') as f:
-                label_dict = pickle.load(f)
-            
-            id_to_name = {v: k for k, v in label_dict.items()}
+            tracks, _ = self.recognizer.recognize(gray, faces)
         except Exception as e:
-            print(f"Error loading recognizer: {e}")
+            print(f"Error predicting: {e}")
             return
         
-        # Process largest face
-        x, y, w, h = faces[0]
-        face_region = gray[y:y+h, x:x+w]
+        if len(tracks) == 0:
+            self.detected_people = []
+            self.detected_person = None
+            self.pipeline.call_soon(self.show_detection, "Not Detected", '#e74c3c', "0%", tk.DISABLED)
+            cv2.putText(frame, "No Face Detected", (20, 40),
+                       cv2.FONT_HERSHEY_SIMPLEX, 1.0, (0, 0, 255), 3)
+            return
         
-        try:
-            id_, confidence = recognizer.predict(face_region)
-        except Exception as e:
-            print(f"Error predicting: {e}")
+        # No model loaded yet
+        if tracks[0].distance is None:
             return
         
-        if confidence < 100:
-            name = id_to_name.get(id_, "Unknown")
-            self.detected_person = name
-            self.detected_confidence = confidence
-            
-            if name == "Unknown":
-                color = (0, 0, 255)
-                self.person_name_label.config(text="Unknown", fg='#e74c3c')
-                self.accept_btn.config(state=tk.DISABLED)
-            else:
+        people = []
+        for track in tracks:
+            x, y, w, h = track.box
+            name = track.name
+            if track.confirmed:
+                if name not in people:
+                    people.append(name)
                 color = (0, 255, 0)
-                self.person_name_label.config(text=name, fg='#2ecc71')
-                self.accept_btn.config(state=tk.NORMAL)
+                label = name
+            elif name != "Unknown":
+                color = (0, 200, 255)
+                label = f"{name}?"
+            else:
+                color = (0, 0, 255)
+                label = name
             
-            confidence_score = int(100 - confidence)
-            self.confidence_label.config(text=f"{confidence_score}%")
+            # Draw rectangle
+            cv2.rectangle(frame, (x, y), (x+w, y+h), color, 2)
+            cv2.rectangle(frame, (x, y+h-35), (x+w, y+h), color, cv2.FILLED)
+            cv2.putText(frame, label, (x+6, y+h-6),
+                       cv2.FONT_HERSHEY_DUPLEX, 0.6, (255, 255, 255), 1)
+        
+        self.detected_people = people
+        self.detected_person = people[0] if people else None
+        
+        # Confidence shown for the largest face, averaged over its votes
+        confidence = tracks[0].distance
+        self.detected_confidence = confidence
+        confidence_text = f"{int(100 - confidence)}%" if confidence < 100 else "Low"
+        
+        if people:
+            self.pipeline.call_soon(self.show_detection, ", ".join(people), '#2ecc71',
+                                    confidence_text, tk.NORMAL)
         else:
-            color = (0, 0, 255)
-            self.detected_person = None
-            self.person_name_label.config(text="Unknown", fg='#e74c3c')
-            self.confidence_label.config(text="Low")
-            self.accept_btn.config(state=tk.DISABLED)
-        
-        # Draw rectangle
-        cv2.rectangle(frame, (x, y), (x+w, y+h), color, 2)
-        cv2.rectangle(frame, (x, y+h-35), (x+w, y+h), color, cv2.FILLED)
-        display_name = self.detected_person if self.detected_person else "Unknown"
-        cv2.putText(frame, f"{display_name}", (x+6, y+h-6),
-                   cv2.FONT_HERSHEY_DUPLEX, 0.6, (255, 255, 255), 1)
+            self.pipeline.call_soon(self.show_detection, "Unknown", '#e74c3c',
+                                    confidence_text, tk.DISABLED)
     
-    def accept_attendance(self):
-        if not self.detected_person or self.detected_person == "Unknown":
-            messagebox.showwarning("Warning", "Please ensure a valid person is detected!")
-            return
-        
+    def mark_person(self, person):
+        """Mark one recognized person. Returns (status, detail)"""
         # Get student info from database - try exact match first, then case-insensitive
-        student_info = self.db.get_student_by_name(self.detected_person)
+        student_info = self.db.get_student_by_name(person)
         
         if not student_info:
             # Try case-insensitive search if exact match fails
-            all_students = self.db.get_all_students()
-            for student_id, name, email, student_id_num, status, created_at in all_students:
-                if name.lower() == self.detected_person.lower():
-                    student_info = (student_id, name, email, student_id_num, status)
-                    break
+            student_info = self.db.get_student_by_name_nocase(person)
         
         if not student_info:
-            messagebox.showerror("Error", f"Student '{self.detected_person}' not found in database!\n\nPlease register this student first.")
-            return
+            return 'missing', None
         
         student_id = student_info[0]
-        today = datetime.now().strftime("%Y-%m-%d")
         
         # Check if already marked today
-        existing = self.db.check_attendance_today(student_id, today)
-        if existing:
-            messagebox.showinfo("Info", f"Attendance already marked today for {self.detected_person}!")
-            self.attendance_status_label.config(text="Already Marked Today", fg='#e74c3c')
+        if self.sink.is_marked(student_id):
+            return 'already', None
+        
+        # Mark attendance (written to the database by the sink's next batch)
+        success, result = self.sink.mark(student_id, student_info[1], 'present')
+        return ('marked' if success else 'error'), result
+    
+    def accept_attendance(self):
+        people = list(self.detected_people)
+        if not people:
+            messagebox.showwarning("Warning", "Please ensure a valid person is detected!")
             return
         
-        # Mark attendance
-        time_now = datetime.now().strftime("%H:%M:%S")
-        success, message = self.db.mark_attendance(student_id, today, time_now, 'present')
+        if len(people) == 1:
+            person = people[0]
+            status, result = self.mark_person(person)
+            
+            if status == 'missing':
+                messagebox.showerror("Error", f"Student '{person}' not found in database!\n\nPlease register this student first.")
+            elif status == 'already':
+                messagebox.showinfo("Info", f"Attendance already marked today for {person}!")
+                self.attendance_status_label.config(text="Already Marked Today", fg='#e74c3c')
+            elif status == 'marked':
+                messagebox.showinfo("Success", f"Attendance marked for {person}!\n\nTime: {result}")
+                self.attendance_status_label.config(text=f"✓ Marked at {result}", fg='#2ecc71')
+            else:
+                messagebox.showerror("Error", f"Failed to mark attendance: {result}")
+                self.attendance_status_label.config(text="Failed to mark attendance", fg='#e74c3c')
+            return
         
-        if success:
-            messagebox.showinfo("Success", f"Attendance marked for {self.detected_person}!\n\nTime: {time_now}")
-            self.attendance_status_label.config(text=f"✓ Marked at {time_now}", fg='#2ecc71')
-        else:
-            messagebox.showerror("Error", f"Failed to mark attendance: {message}")
-            self.attendance_status_label.config(text="Failed to mark attendance", fg='#e74c3c')
+        # Group in frame: mark everyone in one pass
+        results = {'marked': [], 'already': [], 'missing': [], 'error': []}
+        for person in people:
+            status, _ = self.mark_person(person)
+            results[status].append(person)
+        
+        lines = []
+        if results['marked']:
+            lines.append(f"Marked: {', '.join(results['marked'])}")
+        if results['already']:
+            lines.append(f"Already marked today: {', '.join(results['already'])}")
+        if results['missing']:
+            lines.append(f"Not in database: {', '.join(results['missing'])}")
+        if results['error']:
+            lines.append(f"Failed: {', '.join(results['error'])}")
+        messagebox.showinfo("Group Attendance", "\n\n".join(lines))
+        
+        time_now = datetime.now().strftime("%H:%M:%S")
+        self.attendance_status_label.config(
+            text=f"✓ {len(results['marked'])} of {len(people)} marked at {time_now}",
+            fg='#2ecc71' if results['marked'] else '#e74c3c')
     
     def go_back(self):
         self.stop_camera()
+        self.sink.flush()
         self.db.close()
         self.root.destroy()
         if self.main_app:
@@ -322,4 +363,5 @@ class AttendancePage:
     
     def on_closing(self):
         self.stop_camera()
+        self.sink.flush()
         self.db.close()
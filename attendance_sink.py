@@ -0,0 +1,218 @@
+import atexit
+import threading
+import time
+from datetime import datetime
+
+from attendance_ledger import DailyLedger
+from database import AttendanceDatabase
+
+
+class AttendanceSink:
+    """Queues attendance marks and writes them to the database in batches.
+    
+    Marks are checked against an in-memory set of students already marked
+    for the day, queued, and written by a background thread with one
+    executemany transaction whenever batch_size marks are pending or
+    flush_interval seconds have passed since the oldest pending mark.
+    If a write fails, the marks stay queued and the writer backs off,
+    doubling the delay up to MAX_RETRY_DELAY, before it tries again.
+    Optionally every mark is mirrored to the day's CSV file.
+    """
+    
+    MAX_RETRY_DELAY = 60.0
+    
+    def __init__(self, db_path='attendance.db', batch_size=50, flush_interval=2.0, csv_mirror=True):
+        self.db = AttendanceDatabase(db_path)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.ledger = DailyLedger() if csv_mirror else None
+        
+        self.pending = []
+        self.written = 0
+        self.batches = 0
+        self.failures = 0
+        self._retry_at = None
+        self._marked = {}
+        self._student_ids = {}
+        self._oldest_pending = None
+        self._cond = threading.Condition()
+        self._running = True
+        self._thread = threading.Thread(target=self._writer_loop, name="attendance-sink", daemon=True)
+        self._thread.start()
+    
+    def _marked_for(self, date):
+        """Get the set of student ids marked on date (caller holds _cond)"""
+        marked = self._marked.get(date)
+        if marked is None:
+            marked = set(self.db.get_marked_student_ids(date))
+            # Only keep the current day in memory
+            self._marked = {date: marked}
+        return marked
+    
+    def is_marked(self, student_id, date=None):
+        """Check if a student is already marked (written or pending) on date"""
+        date = date or datetime.now().strftime("%Y-%m-%d")
+        with self._cond:
+            return student_id in self._marked_for(date)
+    
+    def marked_count(self, date=None):
+        """Number of students marked on date, including pending marks"""
+        date = date or datetime.now().strftime("%Y-%m-%d")
+        with self._cond:
+            return len(self._marked_for(date))
+    
+    def lookup_student_id(self, name):
+        """Resolve a recognizer label to a student id (cached)"""
+        student_id = self._student_ids.get(name)
+        if student_id is None:
+            student = self.db.get_student_by_name(name) or self.db.get_student_by_name_nocase(name)
+            if student:
+                student_id = student[0]
+                self._student_ids[name] = student_id
+        return student_id
+    
+    def forget_students(self, student_ids=None):
+        """Drop cached name -> id lookups (only those for student_ids if given)"""
+        with self._cond:
+            if student_ids is None:
+                self._student_ids = {}
+            else:
+                self._student_ids = {name: student_id for name, student_id in self._student_ids.items()
+                                     if student_id not in student_ids}
+    
+    def mark(self, student_id, name=None, status='present', when=None):
+        """Queue a mark for a student. Returns (success, message)"""
+        now = when or datetime.now()
+        date = now.strftime("%Y-%m-%d")
+        time_in = now.strftime("%H:%M:%S")
+        
+        with self._cond:
+            marked = self._marked_for(date)
+            if student_id in marked:
+                return False, "Attendance already marked today"
+            marked.add(student_id)
+            self.pending.append((student_id, date, time_in, status))
+            if self._oldest_pending is None:
+                self._oldest_pending = time.monotonic()
+            if len(self.pending) >= self.batch_size:
+                self._cond.notify()
+        
+        if self.ledger is not None and name:
+            self.ledger.mark(name, now)
+        return True, time_in
+    
+    def mark_name(self, name, status='present', when=None):
+        """Queue a mark for a recognized name. Returns (success, message)"""
+        student_id = self.lookup_student_id(name)
+        if student_id is None:
+            # Not in the database; keep the CSV record only
+            if self.ledger is not None and self.ledger.mark(name, when):
+                return True, "Marked in CSV only (student not in database)"
+            return False, f"Student '{name}' not found in database"
+        return self.mark(student_id, name, status, when)
+    
+    def flush(self):
+        """Write all pending marks in one transaction"""
+        with self._cond:
+            records = self.pending
+            self.pending = []
+            self._oldest_pending = None
+        if not records:
+            return True
+        
+        success, message = self.db.mark_attendance_many(records)
+        
+        if success:
+            with self._cond:
+                failures = self.failures
+                self.written += len(records)
+                self.batches += 1
+                self.failures = 0
+                self._retry_at = None
+            if failures:
+                print(f"Attendance batch written after {failures} failed attempt(s)")
+            return True
+        
+        # The student may have been deleted or re-added, so look their id up again
+        self.forget_students({record[0] for record in records})
+        with self._cond:
+            # Keep the marks and wait before the writer thread retries, however many are queued
+            self.pending = records + self.pending
+            if self._oldest_pending is None:
+                self._oldest_pending = time.monotonic()
+            self.failures += 1
+            failures = self.failures
+            delay = min(max(self.flush_interval, 1.0) * 2 ** min(failures - 1, 10), self.MAX_RETRY_DELAY)
+            self._retry_at = time.monotonic() + delay
+        # Report a failure streak once, not on every retry
+        if failures == 1:
+            print(f"Error writing attendance batch: {message} (retrying in the background)")
+        return False
+    
+    def _writer_loop(self):
+        while True:
+            with self._cond:
+                while self._running:
+                    if self._retry_at is not None:
+                        remaining = self._retry_at - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._cond.wait(remaining)
+                        continue
+                    if len(self.pending) >= self.batch_size:
+                        break
+                    if self._oldest_pending is not None:
+                        remaining = self.flush_interval - (time.monotonic() - self._oldest_pending)
+                        if remaining <= 0:
+                            break
+                        self._cond.wait(remaining)
+                    else:
+                        self._cond.wait()
+                running = self._running
+            self.flush()
+            if not running:
+                return
+    
+    def get_stats(self):
+        with self._cond:
+            return {
+                'pending': len(self.pending),
+                'written': self.written,
+                'batches': self.batches,
+                'failures': self.failures,
+            }
+    
+    def close(self):
+        """Flush pending marks and stop the writer thread"""
+        with self._cond:
+            if not self._running:
+                return
+            self._running = False
+            self._cond.notify()
+        self._thread.join(timeout=5.0)
+        self.flush()
+        if self.ledger is not None:
+            self.ledger.close()
+        self.db.close()
+
+
+_shared_sink = None
+_shared_lock = threading.Lock()
+
+
+def get_attendance_sink():
+    """Get the attendance sink shared by all pages in this process"""
+    global _shared_sink
+    with _shared_lock:
+        if _shared_sink is None:
+            _shared_sink = AttendanceSink()
+            atexit.register(_shared_sink.close)
+        return _shared_sink
+
+
+def students_changed():
+    """Tell the shared sink that students were added, renamed or deleted"""
+    with _shared_lock:
+        sink = _shared_sink
+    if sink is not None:
+        sink.forget_students()
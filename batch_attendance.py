@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Batch Attendance From Recordings
+Runs detection and recognition over recorded video files (e.g. lecture hall
+recordings or saved RTSP dumps) as fast as the CPU allows and marks
+attendance with the time each person was first seen on each day the
+recordings cover.
+
+Usage:
+    python batch_attendance.py lecture.mp4 [more.mp4 ...] [--stride 5] [--workers 4]
+                               [--start "2024-01-15 09:00:00"] [--segment-seconds 60] [--dry-run]
+
+Without --start, a recording is assumed to have ended at its file
+modification time.
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+
+import cv2
+
+from frame_recognizer import FrameRecognizer, iter_frames
+
+
+def make_recognizer():
+    return FrameRecognizer()
+
+
+def probe_video(path):
+    """Return (frame count, fps) of a video file"""
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise ValueError(f"Could not open video {path!r}")
+    try:
+        frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
+    finally:
+        cap.release()
+    if frames <= 0 or fps <= 0:
+        raise ValueError(f"Could not read frame count and FPS of {path!r}")
+    return frames, fps
+
+
+def split_segments(path, frames, fps, segment_seconds, workers):
+    """Split a video into (path, start frame, end frame) segments"""
+    # At least one segment per worker so short videos still run in parallel
+    length = min(max(1, int(segment_seconds * fps)), max(1, -(-frames // workers)))
+    return [(path, start, min(start + length, frames)) for start in range(0, frames, length)]
+
+
+def process_segment(path, start_frame, end_frame, stride):
+    """Recognize one segment of a video (runs in a worker process).
+    
+    Returns {'path', 'frames', 'seconds', 'sightings': [(name, seconds into video, frame index)]}
+    """
+    # One OpenCV thread per process; the pool provides the parallelism
+    cv2.setNumThreads(1)
+    recognizer = make_recognizer()
+    started = time.perf_counter()
+    sightings = []
+    frames = 0
+    
+    for index, seconds, frame in iter_frames(path, stride, start_frame, end_frame):
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        _, names = recognizer.process(gray)
+        for name in names:
+            sightings.append((name, seconds, index))
+        frames += 1
+    
+    return {
+        'path': path,
+        'frames': frames,
+        'seconds': time.perf_counter() - started,
+        'sightings': sightings,
+    }
+
+
+def recording_start(path, frames, fps, start=None):
+    """Wall-clock time of a recording's first frame"""
+    if start is not None:
+        return start
+    return datetime.fromtimestamp(os.path.getmtime(path)) - timedelta(seconds=frames / fps)
+
+
+def first_sightings(results, starts):
+    """Earliest sighting of each person on each day: {(name, date): (when, path, frame index)}"""
+    first = {}
+    for result in results:
+        for name, seconds, index in result['sightings']:
+            when = starts[result['path']] + timedelta(seconds=seconds)
+            key = (name, when.date())
+            if key not in first or when < first[key][0]:
+                first[key] = (when, result['path'], index)
+    return first
+
+
+def run_batch(paths, stride=5, workers=None, segment_seconds=60.0, start=None):
+    """Process videos in parallel. Returns ({(name, date): (when, path, frame index)}, stats)"""
+    workers = workers or os.cpu_count() or 1
+    segments = []
+    starts = {}
+    total_frames = 0
+    for path in paths:
+        frames, fps = probe_video(path)
+        starts[path] = recording_start(path, frames, fps, start)
+        segments.extend(split_segments(path, frames, fps, segment_seconds, workers))
+        total_frames += frames
+    
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(process_segment, path, first, last, stride)
+                   for path, first, last in segments]
+        results = [future.result() for future in futures]
+    elapsed = time.perf_counter() - started
+    
+    stats = {
+        'videos': len(paths),
+        'segments': len(segments),
+        'video_frames': total_frames,
+        'processed_frames': sum(result['frames'] for result in results),
+        'seconds': elapsed,
+    }
+    return first_sightings(results, starts), stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mark attendance from recorded videos")
+    parser.add_argument('videos', nargs='+', help="Video files to process")
+    parser.add_argument('--stride', type=int, default=5, help="Process every Nth frame")
+    parser.add_argument('--workers', type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument('--segment-seconds', type=float, default=60.0,
+                        help="Length of the video segment given to each worker task")
+    parser.add_argument('--start', help="Recording start time, 'YYYY-MM-DD HH:MM:SS'")
+    parser.add_argument('--dry-run', action='store_true', help="Print marks without saving them")
+    args = parser.parse_args()
+    
+    start = datetime.strptime(args.start, "%Y-%m-%d %H:%M:%S") if args.start else None
+    try:
+        first, stats = run_batch(args.videos, max(1, args.stride), args.workers, args.segment_seconds, start)
+    except ValueError as e:
+        print(e)
+        return 1
+    
+    print(f"Processed {stats['processed_frames']} of {stats['video_frames']} frames "
+          f"({stats['segments']} segments) in {stats['seconds']:.1f}s "
+          f"({stats['processed_frames'] / stats['seconds'] if stats['seconds'] else 0.0:.1f} frames/s)")
+    
+    sink = None
+    if not args.dry_run:
+        from attendance_sink import get_attendance_sink
+        sink = get_attendance_sink()
+    
+    # One mark per person per day, in time order so the sink moves through the days in turn
+    for (name, _), (when, path, index) in sorted(first.items(), key=lambda item: item[1][0]):
+        message = ""
+        if sink is not None:
+            _, message = sink.mark_name(name, when=when)
+        print(f"{when:%Y-%m-%d %H:%M:%S}  {name:<20} {os.path.basename(path)} frame {index}  {message}")
+    
+    if sink is not None:
+        sink.flush()
+    days = len({day for _, day in first})
+    print(f"{len({name for name, _ in first})} people seen, {len(first)} marks over {days} day(s)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Compare Benchmark Results
+Prints the change of every numeric metric between two bench/run_all.py
+result files, matched by benchmark and case.
+
+Usage: python bench/compare.py baseline.json candidate.json
+"""
+
+import argparse
+import json
+
+
+def index_results(report):
+    return {(benchmark, result['case']): result
+            for benchmark, results in report['benchmarks'].items()
+            for result in results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files")
+    parser.add_argument('baseline')
+    parser.add_argument('candidate')
+    args = parser.parse_args()
+    
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+    
+    print(f"baseline {baseline.get('commit')}  ->  candidate {candidate.get('commit')}")
+    old_results = index_results(baseline)
+    for key, new in index_results(candidate).items():
+        old = old_results.get(key)
+        if old is None:
+            continue
+        print(f"\n{key[0]} / {key[1]}")
+        for metric, value in new.items():
+            previous = old.get(metric)
+            if isinstance(value, bool) or not isinstance(value, (int, float)) or not isinstance(previous, (int, float)):
+                continue
+            change = f"{(value - previous) / previous:+7.1%}" if previous else "    n/a"
+            print(f"  {metric:<28} {previous:12.3f} -> {value:12.3f}  {change}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Database Concurrency Benchmark
+Measures reader/writer throughput on attendance.db-style databases with the
+old rollback journal settings and with WAL + synchronous=NORMAL.
+
+Usage: python bench/db_concurrency.py [--students 2000] [--readers 3] [--seconds 5]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import AttendanceDatabase
+
+CONFIGS = {
+    'rollback': {'journal_mode': 'DELETE', 'synchronous': 'FULL', 'mmap_size': 0},
+    'wal': {'journal_mode': 'WAL', 'synchronous': 'NORMAL'},
+}
+
+
+def seed_database(path, students):
+    db = AttendanceDatabase(path, journal_mode='DELETE')
+    db.cursor.executemany('''
+        INSERT INTO students (name, email, student_id) VALUES (?, ?, ?)
+    ''', [(f"Student {i}", f"student{i}@example.com", f"S{i:06d}") for i in range(students)])
+    db.conn.commit()
+    db.close()
+
+
+def run_config(name, settings, students, readers, seconds):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'attendance.db')
+        seed_database(path, students)
+        
+        db = AttendanceDatabase(path, busy_timeout=30000, **settings)
+        stop = threading.Event()
+        counts = {'reads': 0, 'writes': 0, 'errors': 0}
+        counts_lock = threading.Lock()
+        
+        def reader():
+            done = 0
+            while not stop.is_set():
+                db.get_daily_attendance('2024-01-01')
+                done += 1
+            with counts_lock:
+                counts['reads'] += done
+        
+        def writer():
+            done = 0
+            errors = 0
+            student_id = 1
+            while not stop.is_set():
+                # One commit per mark, like the original mark_attendance path
+                success, _ = db.mark_attendance(student_id, '2024-01-01', '08:00:00')
+                if success:
+                    done += 1
+                else:
+                    errors += 1
+                student_id = student_id % students + 1
+            with counts_lock:
+                counts['writes'] += done
+                counts['errors'] += errors
+        
+        threads = [threading.Thread(target=reader) for _ in range(readers)]
+        threads.append(threading.Thread(target=writer))
+        for thread in threads:
+            thread.start()
+        time.sleep(seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        db.close()
+    
+    return {
+        'case': name,
+        'config': name,
+        'settings': settings,
+        'reads_per_sec': counts['reads'] / seconds,
+        'writes_per_sec': counts['writes'] / seconds,
+        'write_errors': counts['errors'],
+    }
+
+
+def run(students=2000, readers=3, seconds=5.0):
+    return [run_config(name, settings, students, readers, seconds) for name, settings in CONFIGS.items()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark concurrent database readers and a writer")
+    parser.add_argument('--students', type=int, default=2000)
+    parser.add_argument('--readers', type=int, default=3)
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--json', help="Write results to this JSON file")
+    args = parser.parse_args()
+    
+    results = []
+    for name, settings in CONFIGS.items():
+        result = run_config(name, settings, args.students, args.readers, args.seconds)
+        results.append(result)
+        print(f"{name:>9}: {result['reads_per_sec']:8.1f} reads/s  "
+              f"{result['writes_per_sec']:8.1f} writes/s  ({result['write_errors']} write errors)")
+    
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'benchmark': 'db_concurrency', 'params': vars(args), 'results': results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
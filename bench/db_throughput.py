@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Database Benchmark
+Measures mark_attendance, mark_attendance_many and get_daily_attendance
+throughput against the size of the attendance table.
+
+Usage: python bench/db_throughput.py [--students 500] [--quick] [--json results.json]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import AttendanceDatabase
+
+TABLE_SIZES = [1000, 10000, 100000]
+
+
+def seed_database(db, students, rows):
+    db.cursor.executemany('''
+        INSERT INTO students (name, email, student_id) VALUES (?, ?, ?)
+    ''', [(f"Student {i}", f"student{i}@example.com", f"S{i:06d}") for i in range(students)])
+    
+    start_day = date(2020, 1, 1)
+    days = -(-rows // students)
+    records = [(student + 1, (start_day + timedelta(days=day)).isoformat(), '08:00:00', 'present')
+               for day in range(days) for student in range(students)][:rows]
+    db.cursor.executemany('''
+        INSERT INTO attendance (student_id, date, time_in, status) VALUES (?, ?, ?, ?)
+    ''', records)
+    db.conn.commit()
+    return (start_day + timedelta(days=days // 2)).isoformat()
+
+
+def run(students=500, quick=False):
+    results = []
+    for rows in TABLE_SIZES[:2] if quick else TABLE_SIZES:
+        with tempfile.TemporaryDirectory() as tmp:
+            db = AttendanceDatabase(os.path.join(tmp, 'attendance.db'))
+            busy_date = seed_database(db, students, rows)
+            
+            # One commit per mark, like the original attendance path
+            marks = min(students, 200)
+            start = time.perf_counter()
+            for student_id in range(1, marks + 1):
+                db.mark_attendance(student_id, '2030-01-01', '08:00:00')
+            single = marks / (time.perf_counter() - start)
+            
+            records = [(student_id, '2030-01-02', '08:00:00', 'present') for student_id in range(1, students + 1)]
+            start = time.perf_counter()
+            db.mark_attendance_many(records)
+            batched = len(records) / (time.perf_counter() - start)
+            
+            queries = 50
+            start = time.perf_counter()
+            for _ in range(queries):
+                db.get_daily_attendance(busy_date)
+            daily = queries / (time.perf_counter() - start)
+            db.close()
+        
+        results.append({
+            'case': f"{rows} rows",
+            'rows': rows,
+            'students': students,
+            'marks_per_sec': single,
+            'batched_marks_per_sec': batched,
+            'daily_queries_per_sec': daily,
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark attendance database operations")
+    parser.add_argument('--students', type=int, default=500)
+    parser.add_argument('--quick', action='store_true')
+    parser.add_argument('--json', help="Write results to this JSON file")
+    args = parser.parse_args()
+    
+    results = run(args.students, args.quick)
+    for result in results:
+        print(f"{result['case']:>12}: {result['marks_per_sec']:8.1f} marks/s  "
+              f"{result['batched_marks_per_sec']:9.1f} batched marks/s  "
+              f"{result['daily_queries_per_sec']:7.1f} daily queries/s")
+    
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'benchmark': 'db_throughput', 'params': vars(args), 'results': results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Detection Benchmark
+Measures Haar cascade detection FPS at several frame resolutions: the full
+cascade on every frame (the original update_frame path), the cascade on a
+half-size frame, and the DetectionScheduler.
+
+Usage: python bench/detection.py [--frames 30] [--quick] [--json results.json]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cv2
+
+from bench.synthetic import cascade_path, make_frames
+from face_detector import DetectionScheduler
+
+RESOLUTIONS = [(320, 240), (640, 480), (1280, 720)]
+
+
+def measure(detect, grays):
+    start = time.perf_counter()
+    for gray in grays:
+        detect(gray)
+    elapsed = time.perf_counter() - start
+    return len(grays) / elapsed if elapsed else 0.0
+
+
+def run(frames=30, quick=False):
+    cascade = cv2.CascadeClassifier(cascade_path())
+    if cascade.empty():
+        raise RuntimeError("Could not load the Haar cascade")
+    
+    results = []
+    for resolution in RESOLUTIONS[:2] if quick else RESOLUTIONS:
+        grays = [cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) for frame in make_frames(frames, resolution)]
+        half = DetectionScheduler(cascade)
+        half.full_every = 1
+        results.append({
+            'case': f"{resolution[0]}x{resolution[1]}",
+            'frames': frames,
+            'cascade_fps': measure(lambda gray: cascade.detectMultiScale(gray, 1.3, 5), grays),
+            'cascade_half_fps': measure(half, grays),
+            'scheduler_fps': measure(DetectionScheduler(cascade), grays),
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark face detection")
+    parser.add_argument('--frames', type=int, default=30)
+    parser.add_argument('--quick', action='store_true')
+    parser.add_argument('--json', help="Write results to this JSON file")
+    args = parser.parse_args()
+    
+    results = run(args.frames, args.quick)
+    for result in results:
+        print(f"{result['case']:>10}: cascade {result['cascade_fps']:7.1f} FPS  "
+              f"half-size {result['cascade_half_fps']:7.1f} FPS  scheduler {result['scheduler_fps']:7.1f} FPS")
+    
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'benchmark': 'detection', 'params': vars(args), 'results': results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
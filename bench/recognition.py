@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Recognition Benchmark
+Measures per-face prediction latency against the number of enrolled people,
+for recognizer.predict() and the batched LBPHMatcher.
+
+Usage: python bench/recognition.py [--samples 10] [--queries 20] [--quick] [--json results.json]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cv2
+import numpy as np
+
+from bench.synthetic import make_people
+from lbph_engine import LBPHMatcher
+
+PEOPLE = [10, 50, 100, 200]
+
+
+def run(samples=10, queries=20, quick=False):
+    results = []
+    for people in PEOPLE[:2] if quick else PEOPLE:
+        dataset = make_people(people, samples + 1, seed=people)
+        faces, labels, probes = [], [], []
+        for label, (_, person_faces) in enumerate(dataset):
+            faces.extend(person_faces[:samples])
+            labels.extend([label] * samples)
+            probes.append(person_faces[samples])
+        probes = [probes[i % len(probes)] for i in range(queries)]
+        
+        recognizer = cv2.face.LBPHFaceRecognizer_create()
+        start = time.perf_counter()
+        recognizer.train(faces, np.array(labels))
+        train_seconds = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        for probe in probes:
+            recognizer.predict(probe)
+        predict_ms = (time.perf_counter() - start) * 1000 / queries
+        
+        matcher = LBPHMatcher.from_recognizer(recognizer)
+        start = time.perf_counter()
+        matcher.predict_batch(probes)
+        batch_ms = (time.perf_counter() - start) * 1000 / queries
+        
+        results.append({
+            'case': f"{people} people",
+            'people': people,
+            'samples': len(faces),
+            'train_seconds': train_seconds,
+            'predict_ms_per_face': predict_ms,
+            'matcher_ms_per_face': batch_ms,
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark LBPH prediction latency")
+    parser.add_argument('--samples', type=int, default=10, help="Samples per person")
+    parser.add_argument('--queries', type=int, default=20)
+    parser.add_argument('--quick', action='store_true')
+    parser.add_argument('--json', help="Write results to this JSON file")
+    args = parser.parse_args()
+    
+    results = run(args.samples, args.queries, args.quick)
+    for result in results:
+        print(f"{result['case']:>12}: predict {result['predict_ms_per_face']:7.2f} ms/face  "
+              f"matcher {result['matcher_ms_per_face']:7.2f} ms/face")
+    
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'benchmark': 'recognition', 'params': vars(args), 'results': results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
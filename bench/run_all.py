@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Benchmark Suite
+Runs every benchmark on synthetic data and writes one JSON file tagged with
+the current commit, so results can be compared across commits with
+bench/compare.py.
+
+Usage:
+    python bench/run_all.py [--quick] [--only detection,recognition] [--output bench_results.json]
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cv2
+import numpy as np
+
+from bench import db_concurrency, db_throughput, detection, recognition, training
+
+BENCHMARKS = {
+    'detection': lambda quick: detection.run(10 if quick else 30, quick),
+    'recognition': lambda quick: recognition.run(quick=quick),
+    'training': lambda quick: training.run(quick=quick),
+    'db_throughput': lambda quick: db_throughput.run(quick=quick),
+    'db_concurrency': lambda quick: db_concurrency.run(seconds=1.0 if quick else 5.0),
+}
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True,
+                                       cwd=os.path.dirname(os.path.abspath(__file__)),
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the benchmark suite")
+    parser.add_argument('--quick', action='store_true', help="Smaller cases for a fast check")
+    parser.add_argument('--only', help="Comma-separated benchmark names: " + ", ".join(BENCHMARKS))
+    parser.add_argument('--output', default='bench_results.json', help="JSON file to write")
+    args = parser.parse_args()
+    
+    names = args.only.split(',') if args.only else list(BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"Unknown benchmark(s): {', '.join(unknown)}")
+    
+    report = {
+        'commit': git_commit(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'quick': args.quick,
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'opencv': cv2.__version__,
+            'numpy': np.__version__,
+        },
+        'benchmarks': {},
+    }
+    
+    for name in names:
+        print(f"Running {name}...")
+        start = time.perf_counter()
+        report['benchmarks'][name] = BENCHMARKS[name](args.quick)
+        print(f"  done in {time.perf_counter() - start:.1f}s")
+    
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Synthetic data for the benchmarks: face-like grayscale crops and camera
+frames, generated from a seed so runs are comparable without a camera.
+"""
+
+import os
+
+import cv2
+import numpy as np
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def cascade_path():
+    """Haar cascade shipped with OpenCV, or the copy in the repository"""
+    data_dir = getattr(getattr(cv2, 'data', None), 'haarcascades', '')
+    path = os.path.join(data_dir, 'haarcascade_frontalface_default.xml')
+    if data_dir and os.path.exists(path):
+        return path
+    return os.path.join(REPO_ROOT, 'haarcascade_frontalface_default.xml')
+
+
+def _base_face(rng, size):
+    """A smooth random pattern with an oval, eyes and a mouth"""
+    width, height = size
+    face = cv2.GaussianBlur(rng.integers(40, 200, (height, width), dtype=np.uint8), (0, 0), 6)
+    cv2.ellipse(face, (width // 2, height // 2), (width * 2 // 5, height // 2 - 4), 0, 0, 360,
+                int(rng.integers(140, 220)), -1)
+    for eye_x in (width // 3, width * 2 // 3):
+        cv2.circle(face, (eye_x, height * 2 // 5), max(2, width // 16), int(rng.integers(10, 60)), -1)
+    cv2.ellipse(face, (width // 2, height * 7 // 10), (width // 6, height // 20), 0, 0, 360,
+                int(rng.integers(30, 90)), -1)
+    return face
+
+
+def make_people(people, samples, size=(100, 100), seed=0):
+    """Return [(name, [face, ...])] with samples varied by shift, brightness and noise"""
+    rng = np.random.default_rng(seed)
+    dataset = []
+    for p in range(people):
+        base = _base_face(rng, size)
+        faces = []
+        for _ in range(samples):
+            dx, dy = rng.integers(-3, 4, size=2)
+            shift = np.float32([[1, 0, dx], [0, 1, dy]])
+            face = cv2.warpAffine(base, shift, size, borderMode=cv2.BORDER_REFLECT)
+            face = face.astype(np.int16) + int(rng.integers(-20, 21)) + rng.integers(-8, 9, face.shape, dtype=np.int16)
+            faces.append(np.clip(face, 0, 255).astype(np.uint8))
+        dataset.append((f"person{p:04d}", faces))
+    return dataset
+
+
+def make_frames(count, resolution=(640, 480), faces_per_frame=1, seed=0):
+    """Return count BGR frames with synthetic faces moving across a textured background"""
+    rng = np.random.default_rng(seed)
+    width, height = resolution
+    background = cv2.GaussianBlur(rng.integers(0, 255, (height, width), dtype=np.uint8), (0, 0), 3)
+    face_size = max(24, min(width, height) // 3)
+    faces = [_base_face(rng, (face_size, face_size)) for _ in range(faces_per_frame)]
+    
+    frames = []
+    for i in range(count):
+        gray = background.copy()
+        for f, face in enumerate(faces):
+            x = (f * face_size + i * 4) % max(1, width - face_size)
+            y = (height - face_size) // 2
+            gray[y:y + face_size, x:x + face_size] = face
+        frames.append(cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR))
+    return frames
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Training Benchmark
+Measures FaceTrainer wall time against the number of samples: a full
+rebuild with a cold decode cache, a full rebuild with a warm cache, and
+incremental training of one new person.
+
+Usage: python bench/training.py [--samples-per-person 20] [--quick] [--json results.json]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cv2
+
+from bench.synthetic import make_people
+from face_trainer import FaceTrainer
+from training_data import TrainingDataLoader
+
+SAMPLE_COUNTS = [100, 500, 2000]
+
+
+def write_images(images_path, dataset):
+    os.makedirs(images_path, exist_ok=True)
+    for name, faces in dataset:
+        for i, face in enumerate(faces):
+            cv2.imwrite(os.path.join(images_path, f"{name}_{i}.jpg"), face)
+
+
+def run(samples_per_person=20, quick=False):
+    results = []
+    for total in SAMPLE_COUNTS[:2] if quick else SAMPLE_COUNTS:
+        people = max(2, total // samples_per_person)
+        dataset = make_people(people + 1, samples_per_person, seed=total)
+        with tempfile.TemporaryDirectory() as tmp:
+            images_path = os.path.join(tmp, 'images')
+            write_images(images_path, dataset[:people])
+            trainer = FaceTrainer(images_path, os.path.join(tmp, 'face_recognizer.yml'),
+                                  os.path.join(tmp, 'labels.pkl'),
+                                  loader=TrainingDataLoader(os.path.join(tmp, '.face_cache')))
+            
+            start = time.perf_counter()
+            trainer.train_full()
+            cold = time.perf_counter() - start
+            
+            start = time.perf_counter()
+            trainer.train_full()
+            warm = time.perf_counter() - start
+            
+            write_images(images_path, dataset[people:])
+            start = time.perf_counter()
+            result = trainer.train(dataset[people][0])
+            incremental = time.perf_counter() - start
+        
+        results.append({
+            'case': f"{people * samples_per_person} samples",
+            'people': people,
+            'samples': people * samples_per_person,
+            'full_cold_seconds': cold,
+            'full_warm_seconds': warm,
+            'incremental_seconds': incremental,
+            'incremental_mode': result['mode'],
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark model training")
+    parser.add_argument('--samples-per-person', type=int, default=20)
+    parser.add_argument('--quick', action='store_true')
+    parser.add_argument('--json', help="Write results to this JSON file")
+    args = parser.parse_args()
+    
+    results = run(args.samples_per_person, args.quick)
+    for result in results:
+        print(f"{result['case']:>14}: full (cold) {result['full_cold_seconds']:6.2f}s  "
+              f"full (warm) {result['full_warm_seconds']:6.2f}s  "
+              f"incremental {result['incremental_seconds']:6.2f}s")
+    
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'benchmark': 'training', 'params': vars(args), 'results': results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Multi-Camera Attendance Server
+Serves several cameras or streams from one process: one capture thread per
+camera, one shared face model, a shared pool of recognition workers and one
+attendance writer.
+
+Usage:
+    python camera_server.py --camera entrance=0 --camera side=1 \\
+                            --camera hall=rtsp://10.0.0.5/stream [--workers 4] [--log-interval 10]
+"""
+
+import argparse
+import queue
+import threading
+import time
+from datetime import datetime
+
+import cv2
+
+from attendance_sink import get_attendance_sink
+from face_detector import DetectionScheduler
+from face_model import get_model_holder
+from frame_pipeline import StageStats
+from frame_recognizer import FrameRecognizer, parse_source
+
+
+class CameraSource:
+    """One capture source with its own frame queue, tracker state and stats"""
+    
+    def __init__(self, name, source, model, queue_size=2, flip=None):
+        self.name = name
+        self.source = parse_source(source)
+        self.flip = isinstance(self.source, int) if flip is None else flip
+        self.frames = queue.Queue(maxsize=queue_size)
+        self.recognizer = FrameRecognizer(model, DetectionScheduler())
+        self.stats = StageStats()
+        self.cap = None
+        self.failed = False
+        self.dropped = 0
+        self.marked = 0
+        
+        # Names this camera already marked today, so repeat sightings skip the sink
+        self.seen = set()
+        self.seen_date = None
+        
+        # Set while the camera is queued for or held by a worker
+        self.scheduled = False
+        self.lock = threading.Lock()
+    
+    def open(self):
+        self.cap = cv2.VideoCapture(self.source)
+        if not self.cap.isOpened():
+            self.cap.release()
+            self.cap = None
+            return False
+        return True
+    
+    def release(self):
+        if self.cap:
+            self.cap.release()
+            self.cap = None
+    
+    def get_stats(self):
+        stats = self.stats.snapshot()
+        return {
+            'capture_fps': stats['fps'].get('capture', 0.0),
+            'processed_fps': stats['fps'].get('processed', 0.0),
+            'latency_ms': stats['latency_ms'],
+            'dropped': self.dropped,
+            'queue_depth': self.frames.qsize(),
+            'marked': self.marked,
+            'failed': self.failed,
+        }
+
+
+class CameraServer:
+    """Runs N cameras with per-camera capture threads and a shared worker pool.
+    
+    Each capture thread keeps only the newest frames in its camera's small
+    queue. A camera with frames waiting is put on a shared ready queue once;
+    whichever worker takes it processes one frame, then requeues the camera
+    if more frames are waiting. A camera is therefore handled by one worker
+    at a time (its tracker is not shared), while the workers are shared by
+    all cameras.
+    """
+    
+    def __init__(self, workers=None, queue_size=2, sink=None, model=None):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.sink = sink or get_attendance_sink()
+        self.model = model or get_model_holder()
+        self.cameras = {}
+        self.ready = queue.Queue()
+        self.running = False
+        self._threads = []
+    
+    def add_camera(self, name, source, flip=None):
+        if name in self.cameras:
+            raise ValueError(f"Camera '{name}' already exists")
+        self.cameras[name] = CameraSource(name, source, self.model, self.queue_size, flip)
+        return self.cameras[name]
+    
+    def start(self):
+        """Open every camera and start the threads. Returns the names that could not be opened"""
+        failed = [name for name, camera in self.cameras.items() if not camera.open()]
+        for name in failed:
+            self.cameras[name].failed = True
+        
+        self.running = True
+        workers = self.workers or max(1, len(self.cameras))
+        self._threads = [threading.Thread(target=self._capture_loop, args=(camera,),
+                                          name=f"capture-{camera.name}", daemon=True)
+                         for camera in self.cameras.values() if camera.cap is not None]
+        self._threads += [threading.Thread(target=self._worker_loop, name=f"recognize-{i}", daemon=True)
+                          for i in range(workers)]
+        for thread in self._threads:
+            thread.start()
+        return failed
+    
+    def stop(self):
+        self.running = False
+        for thread in self._threads:
+            thread.join(timeout=2.0)
+        self._threads = []
+        for camera in self.cameras.values():
+            camera.release()
+        self.sink.flush()
+    
+    def _capture_loop(self, camera):
+        while self.running:
+            start = time.perf_counter()
+            ret, frame = camera.cap.read()
+            if not ret:
+                print(f"[{camera.name}] Video source ended or failed")
+                camera.failed = True
+                return
+            if camera.flip:
+                frame = cv2.flip(frame, 1)
+            camera.stats.record('capture', time.perf_counter() - start)
+            camera.stats.tick('capture')
+            
+            # Drop the oldest frame when the workers are behind
+            while True:
+                try:
+                    camera.frames.put_nowait(frame)
+                    break
+                except queue.Full:
+                    try:
+                        camera.frames.get_nowait()
+                        camera.dropped += 1
+                    except queue.Empty:
+                        pass
+            
+            with camera.lock:
+                if not camera.scheduled:
+                    camera.scheduled = True
+                    self.ready.put(camera)
+    
+    def _worker_loop(self):
+        while self.running:
+            try:
+                camera = self.ready.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            
+            try:
+                frame = camera.frames.get_nowait()
+            except queue.Empty:
+                frame = None
+            if frame is not None:
+                try:
+                    self._process(camera, frame)
+                except Exception as e:
+                    print(f"[{camera.name}] Error processing frame: {e}")
+            
+            with camera.lock:
+                if camera.frames.empty():
+                    camera.scheduled = False
+                else:
+                    self.ready.put(camera)
+    
+    def _process(self, camera, frame):
+        start = time.perf_counter()
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        _, names = camera.recognizer.process(gray)
+        
+        today = datetime.now().strftime("%Y-%m-%d")
+        if camera.seen_date != today:
+            camera.seen = set()
+            camera.seen_date = today
+        for name in names:
+            if name in camera.seen:
+                continue
+            camera.seen.add(name)
+            success, message = self.sink.mark_name(name)
+            if success:
+                camera.marked += 1
+                print(f"[{camera.name}] Marked {name}: {message}")
+        
+        camera.stats.record('process', time.perf_counter() - start)
+        camera.stats.tick('processed')
+    
+    def get_stats(self):
+        """Per-camera capture/processed FPS, drops and queue depth"""
+        return {name: camera.get_stats() for name, camera in self.cameras.items()}
+    
+    def log_stats(self):
+        for name, stats in self.get_stats().items():
+            state = " FAILED" if stats['failed'] else ""
+            print(f"[{name}] capture {stats['capture_fps']:5.1f} FPS, processed {stats['processed_fps']:5.1f} FPS, "
+                  f"queue {stats['queue_depth']}, dropped {stats['dropped']}, marked {stats['marked']}{state}")
+
+
+def parse_camera(value):
+    """Parse NAME=SOURCE (or just SOURCE, named after itself)"""
+    name, sep, source = value.partition('=')
+    if not sep:
+        return value, value
+    return name, source
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve several cameras from one process")
+    parser.add_argument('--camera', action='append', required=True, type=parse_camera,
+                        help="NAME=SOURCE, where SOURCE is a camera index or video file/URL (repeatable)")
+    parser.add_argument('--workers', type=int, help="Recognition worker threads (default: one per camera)")
+    parser.add_argument('--log-interval', type=float, default=10.0, help="Seconds between stats logs")
+    args = parser.parse_args()
+    
+    server = CameraServer(args.workers)
+    if not server.model.is_available():
+        print("No trained model found! Please register faces first.")
+        return 1
+    for name, source in args.camera:
+        server.add_camera(name, source)
+    
+    failed = server.start()
+    for name in failed:
+        print(f"Could not open camera '{name}'")
+    if len(failed) == len(server.cameras):
+        server.stop()
+        return 1
+    
+    try:
+        while any(not camera.failed for camera in server.cameras.values()):
+            time.sleep(args.log_interval)
+            server.log_stats()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,20 +1,192 @@
+import argparse
+import json
 import sqlite3
 import os
+import re
+import time
+import threading
+import weakref
 from datetime import datetime
 from pathlib import Path
 
+def create_student_search(cursor):
+    """FTS5 index over student names, IDs and emails, kept in sync by triggers"""
+    try:
+        cursor.execute('''
+            CREATE VIRTUAL TABLE IF NOT EXISTS students_fts USING fts5(
+                name, email, student_id,
+                content='students', content_rowid='id', prefix='2 3'
+            )
+        ''')
+    except sqlite3.OperationalError as e:
+        if 'fts5' not in str(e):
+            raise
+        # search_students() falls back to LIKE on builds without FTS5
+        print("SQLite was built without FTS5; student search will scan the table")
+        return
+    
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS students_fts_insert AFTER INSERT ON students BEGIN
+            INSERT INTO students_fts (rowid, name, email, student_id)
+            VALUES (new.id, new.name, new.email, new.student_id);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS students_fts_delete AFTER DELETE ON students BEGIN
+            INSERT INTO students_fts (students_fts, rowid, name, email, student_id)
+            VALUES ('delete', old.id, old.name, old.email, old.student_id);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS students_fts_update AFTER UPDATE OF name, email, student_id ON students BEGIN
+            INSERT INTO students_fts (students_fts, rowid, name, email, student_id)
+            VALUES ('delete', old.id, old.name, old.email, old.student_id);
+            INSERT INTO students_fts (rowid, name, email, student_id)
+            VALUES (new.id, new.name, new.email, new.student_id);
+        END
+    ''')
+    cursor.execute("INSERT INTO students_fts (students_fts) VALUES ('rebuild')")
+
+# Rebuilds per-student counts from the attendance table
+REBUILD_SUMMARY = [
+    'DELETE FROM attendance_summary',
+    '''INSERT INTO attendance_summary (student_id, present, absent, late, total)
+       SELECT student_id, SUM(status = 'present'), SUM(status = 'absent'),
+              SUM(status = 'late'), COUNT(*)
+       FROM attendance GROUP BY student_id''',
+]
+
+# Keep attendance_summary in step with attendance. The summary row is
+# created with NOT EXISTS rather than INSERT OR IGNORE, because the conflict
+# clause of an outer upsert overrides the one of statements inside triggers
+SUMMARY_TRIGGERS = [
+    '''CREATE TRIGGER IF NOT EXISTS attendance_summary_insert AFTER INSERT ON attendance BEGIN
+           INSERT INTO attendance_summary (student_id) SELECT new.student_id
+           WHERE NOT EXISTS (SELECT 1 FROM attendance_summary WHERE student_id = new.student_id);
+           UPDATE attendance_summary
+           SET present = present + (new.status = 'present'), absent = absent + (new.status = 'absent'),
+               late = late + (new.status = 'late'), total = total + 1
+           WHERE student_id = new.student_id;
+       END''',
+    '''CREATE TRIGGER IF NOT EXISTS attendance_summary_delete AFTER DELETE ON attendance BEGIN
+           UPDATE attendance_summary
+           SET present = present - (old.status = 'present'), absent = absent - (old.status = 'absent'),
+               late = late - (old.status = 'late'), total = total - 1
+           WHERE student_id = old.student_id;
+       END''',
+    '''CREATE TRIGGER IF NOT EXISTS attendance_summary_update AFTER UPDATE OF student_id, status ON attendance BEGIN
+           UPDATE attendance_summary
+           SET present = present - (old.status = 'present'), absent = absent - (old.status = 'absent'),
+               late = late - (old.status = 'late'), total = total - 1
+           WHERE student_id = old.student_id;
+           INSERT INTO attendance_summary (student_id) SELECT new.student_id
+           WHERE NOT EXISTS (SELECT 1 FROM attendance_summary WHERE student_id = new.student_id);
+           UPDATE attendance_summary
+           SET present = present + (new.status = 'present'), absent = absent + (new.status = 'absent'),
+               late = late + (new.status = 'late'), total = total + 1
+           WHERE student_id = new.student_id;
+       END''',
+    '''CREATE TRIGGER IF NOT EXISTS attendance_summary_student_delete AFTER DELETE ON students BEGIN
+           DELETE FROM attendance_summary WHERE student_id = old.id;
+       END''',
+]
+
+# Ordered schema migrations: (version, description, statements).
+# Statements are SQL strings or callables that take a cursor.
+MIGRATIONS = [
+    (1, "Add indexes for daily, summary and name lookups", [
+        '''CREATE INDEX IF NOT EXISTS idx_attendance_date
+           ON attendance(date, student_id, status, time_in)''',
+        '''CREATE INDEX IF NOT EXISTS idx_attendance_student_status
+           ON attendance(student_id, status)''',
+        '''CREATE INDEX IF NOT EXISTS idx_students_name_nocase
+           ON students(name COLLATE NOCASE)''',
+        '''CREATE INDEX IF NOT EXISTS idx_students_status
+           ON students(status, name)''',
+    ]),
+    (2, "Add full-text search over student names, IDs and emails", [
+        create_student_search,
+    ]),
+    (3, "Add per-student attendance counts maintained by triggers", [
+        '''CREATE TABLE IF NOT EXISTS attendance_summary (
+               student_id INTEGER PRIMARY KEY,
+               present INTEGER NOT NULL DEFAULT 0,
+               absent INTEGER NOT NULL DEFAULT 0,
+               late INTEGER NOT NULL DEFAULT 0,
+               total INTEGER NOT NULL DEFAULT 0
+           )''',
+    ] + SUMMARY_TRIGGERS + REBUILD_SUMMARY),
+]
+
+def _close_thread_connection(db_ref, conn, cursor):
+    """Close a thread's connection once the thread is gone, unless close() already did"""
+    db = db_ref()
+    if db is not None:
+        with db._pool_lock:
+            if (conn, cursor) not in db._connections:
+                return
+            db._connections.remove((conn, cursor))
+    cursor.close()
+    conn.close()
+
 class AttendanceDatabase:
-    def __init__(self, db_name='attendance.db'):
+    """SQLite access for students and attendance
+    
+    Each thread that uses an instance gets its own connection, so background
+    workers can read and write while the Tk thread keeps its own. A thread's
+    connection is closed when the thread ends. New
+    connections use WAL journaling by default, which lets dashboards keep
+    reading while an attendance writer commits.
+    """
+    
+    def __init__(self, db_name='attendance.db', journal_mode='WAL', synchronous='NORMAL',
+                 busy_timeout=5000, mmap_size=64 * 1024 * 1024):
         self.db_path = db_name
-        self.conn = None
-        self.cursor = None
+        self.journal_mode = journal_mode
+        self.synchronous = synchronous
+        self.busy_timeout = busy_timeout
+        self.mmap_size = mmap_size
+        self._local = threading.local()
+        self._connections = []
+        self._pool_lock = threading.Lock()
         self.init_database()
     
+    def connect(self):
+        """Open a new connection with the configured pragmas"""
+        conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout / 1000,
+                               check_same_thread=False)
+        if self.journal_mode:
+            conn.execute(f"PRAGMA journal_mode = {self.journal_mode}")
+        if self.synchronous:
+            conn.execute(f"PRAGMA synchronous = {self.synchronous}")
+        conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout)}")
+        if self.mmap_size is not None:
+            conn.execute(f"PRAGMA mmap_size = {int(self.mmap_size)}")
+        return conn
+    
+    @property
+    def conn(self):
+        """Connection owned by the calling thread"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self.connect()
+            self._local.conn = conn
+            self._local.cursor = conn.cursor()
+            with self._pool_lock:
+                self._connections.append((conn, self._local.cursor))
+            # Short-lived workers (one per camera session) must not leave their connection open
+            weakref.finalize(threading.current_thread(), _close_thread_connection,
+                             weakref.ref(self), conn, self._local.cursor)
+        return conn
+    
+    @property
+    def cursor(self):
+        """Cursor of the calling thread's connection"""
+        self.conn
+        return self._local.cursor
+    
     def init_database(self):
         """Initialize the database and create tables if they don't exist"""
-        self.conn = sqlite3.connect(self.db_path)
-        self.cursor = self.conn.cursor()
-        
         # Create students table
         self.cursor.execute('''
             CREATE TABLE IF NOT EXISTS students (
@@ -42,6 +214,50 @@ class AttendanceDatabase:
         ''')
         
         self.conn.commit()
+        self.run_migrations()
+        
+        self.cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'students_fts'")
+        self.has_search_index = self.cursor.fetchone() is not None
+    
+    def get_schema_version(self):
+        """Get the highest applied migration version"""
+        self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS schema_version (
+                version INTEGER PRIMARY KEY,
+                description TEXT,
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        self.cursor.execute('SELECT COALESCE(MAX(version), 0) FROM schema_version')
+        return self.cursor.fetchone()[0]
+    
+    def run_migrations(self):
+        """Apply pending schema migrations in order, each in its own transaction"""
+        if self.get_schema_version() >= MIGRATIONS[-1][0]:
+            return
+        
+        for version, description, statements in MIGRATIONS:
+            # BEGIN IMMEDIATE so two processes don't apply the same migration
+            self.cursor.execute('BEGIN IMMEDIATE')
+            try:
+                self.cursor.execute('SELECT 1 FROM schema_version WHERE version = ?', (version,))
+                if self.cursor.fetchone():
+                    self.conn.rollback()
+                    continue
+                
+                for statement in statements:
+                    if callable(statement):
+                        statement(self.cursor)
+                    else:
+                        self.cursor.execute(statement)
+                
+                self.cursor.execute('''
+                    INSERT INTO schema_version (version, description) VALUES (?, ?)
+                ''', (version, description))
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                raise
     
     def add_student(self, name, email="", student_id=""):
         """Add a new student to the database"""
@@ -53,6 +269,7 @@ class AttendanceDatabase:
             self.conn.commit()
             return True, self.cursor.lastrowid
         except sqlite3.IntegrityError as e:
+            self.conn.rollback()
             return False, str(e)
     
     def get_student_by_name(self, name):
@@ -64,6 +281,15 @@ class AttendanceDatabase:
         result = self.cursor.fetchone()
         return result
     
+    def get_student_by_name_nocase(self, name):
+        """Get student information by name, ignoring case"""
+        self.cursor.execute('''
+            SELECT id, name, email, student_id, status 
+            FROM students WHERE name = ? COLLATE NOCASE
+        ''', (name,))
+        result = self.cursor.fetchone()
+        return result
+    
     def get_all_students(self):
         """Get all students"""
         self.cursor.execute('''
@@ -72,18 +298,90 @@ class AttendanceDatabase:
         ''')
         return self.cursor.fetchall()
     
+    def search_students(self, query='', status=None, after=None, limit=100):
+        """Find students whose name, student ID or email has words starting with the query's words
+        
+        Results are ordered by name and paged by keyset: pass the last name
+        of the previous page as `after` to get the next one, so each page is
+        an index range scan however deep it is. An empty query lists every
+        student. status, if given, must match exactly. Uses the FTS5 index
+        when the database has one, otherwise LIKE over the three columns.
+        """
+        words = re.findall(r'\w+', query)
+        conditions = []
+        params = []
+        
+        if words and self.has_search_index:
+            # A subquery, so SQLite runs MATCH once instead of once per student
+            conditions.append('s.id IN (SELECT rowid FROM students_fts WHERE students_fts MATCH ?)')
+            params.append(' '.join(f'"{word}"*' for word in words))
+        else:
+            for word in words:
+                # _ is the only LIKE wildcard a \w word can contain
+                pattern = '%' + word.replace('_', '\\_') + '%'
+                conditions.append("(s.name LIKE ? ESCAPE '\\' OR s.student_id LIKE ? ESCAPE '\\' "
+                                  "OR s.email LIKE ? ESCAPE '\\')")
+                params += [pattern] * 3
+        if status:
+            conditions.append('s.status = ?')
+            params.append(status)
+        if after is not None:
+            conditions.append('s.name > ?')
+            params.append(after)
+        
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        self.cursor.execute(f'''
+            SELECT s.id, s.name, s.email, s.student_id, s.status, s.created_at
+            FROM students s {where}
+            ORDER BY s.name LIMIT ?
+        ''', params + [limit])
+        return self.cursor.fetchall()
+    
     def mark_attendance(self, student_id, date, time_in, status='present'):
-        """Mark attendance for a student"""
+        """Mark attendance for a student, replacing any mark on that date"""
         try:
+            # An upsert rather than INSERT OR REPLACE, whose implicit delete
+            # skips the delete triggers that keep attendance_summary in step
             self.cursor.execute('''
-                INSERT OR REPLACE INTO attendance (student_id, date, time_in, status)
+                INSERT INTO attendance (student_id, date, time_in, status)
                 VALUES (?, ?, ?, ?)
+                ON CONFLICT (student_id, date) DO UPDATE
+                SET time_in = excluded.time_in, status = excluded.status
             ''', (student_id, date, time_in, status))
             self.conn.commit()
             return True, "Attendance marked successfully"
         except Exception as e:
+            self.conn.rollback()
             return False, str(e)
     
+    def mark_attendance_many(self, records):
+        """Mark attendance for many students in one transaction
+        
+        records is a list of (student_id, date, time_in, status) tuples.
+        Students already marked on that date keep their first mark, except
+        that an absence written by close_out() is replaced.
+        """
+        try:
+            self.cursor.executemany('''
+                INSERT INTO attendance (student_id, date, time_in, status)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT (student_id, date) DO UPDATE
+                SET time_in = excluded.time_in, status = excluded.status
+                WHERE attendance.status = 'absent' AND attendance.time_in IS NULL
+            ''', records)
+            self.conn.commit()
+            return True, f"{len(records)} attendance records saved"
+        except Exception as e:
+            self.conn.rollback()
+            return False, str(e)
+    
+    def get_marked_student_ids(self, date):
+        """Get the ids of all students who attended on a date (any status but absent)"""
+        self.cursor.execute('''
+            SELECT student_id FROM attendance WHERE date = ? AND status != 'absent'
+        ''', (date,))
+        return [row[0] for row in self.cursor.fetchall()]
+    
     def check_attendance_today(self, student_id, date):
         """Check if student has already marked attendance today"""
         self.cursor.execute('''
@@ -114,16 +412,69 @@ class AttendanceDatabase:
             ''', (student_id,))
         return self.cursor.fetchall()
     
+    def get_student_attendance_page(self, student_id, before=None, limit=100):
+        """Get up to limit attendance records for a student, newest first, older than the date `before`"""
+        if before is None:
+            self.cursor.execute('''
+                SELECT a.date, a.time_in, a.status, s.name
+                FROM attendance a
+                JOIN students s ON a.student_id = s.id
+                WHERE a.student_id = ?
+                ORDER BY a.date DESC
+                LIMIT ?
+            ''', (student_id, limit))
+        else:
+            self.cursor.execute('''
+                SELECT a.date, a.time_in, a.status, s.name
+                FROM attendance a
+                JOIN students s ON a.student_id = s.id
+                WHERE a.student_id = ? AND a.date < ?
+                ORDER BY a.date DESC
+                LIMIT ?
+            ''', (student_id, before, limit))
+        return self.cursor.fetchall()
+    
     def get_attendance_summary(self, student_id):
-        """Get attendance summary for a student"""
+        """Get (status, count) pairs for a student's present, absent and late records"""
         self.cursor.execute('''
-            SELECT status, COUNT(*) as count
-            FROM attendance
-            WHERE student_id = ?
-            GROUP BY status
+            SELECT present, absent, late FROM attendance_summary WHERE student_id = ?
         ''', (student_id,))
+        row = self.cursor.fetchone()
+        if row is None:
+            return []
+        return [(status, count) for status, count in zip(('present', 'absent', 'late'), row) if count]
+    
+    def get_attendance_summaries(self):
+        """Get counts and attendance rate for every student in one query
+        
+        Rows are (id, name, student_id, present, absent, late, total, rate),
+        ordered by name. rate is (present + late) / total, 0.0 without records.
+        """
+        self.cursor.execute('''
+            SELECT s.id, s.name, s.student_id,
+                   COALESCE(a.present, 0), COALESCE(a.absent, 0), COALESCE(a.late, 0),
+                   COALESCE(a.total, 0),
+                   CASE WHEN a.total > 0 THEN CAST(a.present + a.late AS REAL) / a.total ELSE 0.0 END
+            FROM students s
+            LEFT JOIN attendance_summary a ON a.student_id = s.id
+            ORDER BY s.name
+        ''')
         return self.cursor.fetchall()
     
+    def rebuild_attendance_summary(self):
+        """Recount attendance_summary from the attendance table in one transaction"""
+        try:
+            self.cursor.execute('BEGIN IMMEDIATE')
+            for statement in REBUILD_SUMMARY:
+                self.cursor.execute(statement)
+            self.cursor.execute('SELECT COUNT(*) FROM attendance_summary')
+            count = self.cursor.fetchone()[0]
+            self.conn.commit()
+            return True, f"Rebuilt attendance summaries for {count} students"
+        except Exception as e:
+            self.conn.rollback()
+            return False, str(e)
+    
     def get_daily_attendance(self, date):
         """Get all attendance records for a specific date"""
         self.cursor.execute('''
@@ -134,6 +485,110 @@ class AttendanceDatabase:
         ''', (date,))
         return self.cursor.fetchall()
     
+    def close_out(self, start_date, end_date=None, session_start=None, skip_weekends=False):
+        """Mark absences and late arrivals for a day or a date range in one transaction
+        
+        Every active student without a mark on a day gets an 'absent' row
+        (time_in NULL), from the day they were registered on. If
+        session_start ('HH:MM:SS') is given, 'present' marks after it become
+        'late'. Both are single set-based statements over a recursive date
+        range, and running it again for the same days changes nothing.
+        Returns (success, (absent, late)) or (False, error message).
+        """
+        end_date = end_date or start_date
+        if session_start:
+            # time_in is compared as text, so '09:00' must become '09:00:00'
+            fmt = '%H:%M:%S' if session_start.count(':') == 2 else '%H:%M'
+            session_start = datetime.strptime(session_start, fmt).strftime('%H:%M:%S')
+        weekday_filter = "AND strftime('%w', d.date) NOT IN ('0', '6')" if skip_weekends else ""
+        try:
+            self.cursor.execute('BEGIN IMMEDIATE')
+            self.cursor.execute(f'''
+                INSERT INTO attendance (student_id, date, time_in, status)
+                WITH RECURSIVE days(date) AS (
+                    SELECT date(?)
+                    UNION ALL
+                    SELECT date(date, '+1 day') FROM days WHERE date < date(?)
+                )
+                SELECT s.id, d.date, NULL, 'absent'
+                FROM days d
+                JOIN students s ON s.status = 'active' AND date(s.created_at) <= d.date
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM attendance a WHERE a.student_id = s.id AND a.date = d.date
+                ) {weekday_filter}
+            ''', (start_date, end_date))
+            absent = self.cursor.rowcount
+            
+            late = 0
+            if session_start:
+                self.cursor.execute('''
+                    UPDATE attendance SET status = 'late'
+                    WHERE date BETWEEN ? AND ? AND status = 'present' AND time_in > ?
+                ''', (start_date, end_date, session_start))
+                late = self.cursor.rowcount
+            self.conn.commit()
+            return True, (absent, late)
+        except Exception as e:
+            self.conn.rollback()
+            return False, str(e)
+    
+    def _attendance_filter(self, start_date, end_date, student_ids):
+        conditions = []
+        params = []
+        if start_date:
+            conditions.append('a.date >= ?')
+            params.append(start_date)
+        if end_date:
+            conditions.append('a.date <= ?')
+            params.append(end_date)
+        if student_ids is not None:
+            # One JSON parameter instead of a placeholder per student
+            conditions.append('a.student_id IN (SELECT value FROM json_each(?))')
+            params.append(json.dumps([int(i) for i in student_ids]))
+        return (f"WHERE {' AND '.join(conditions)}" if conditions else ''), params
+    
+    def count_attendance(self, start_date=None, end_date=None, student_ids=None):
+        """Count attendance records in a date range, optionally for some students only"""
+        where, params = self._attendance_filter(start_date, end_date, student_ids)
+        self.cursor.execute(f'SELECT COUNT(*) FROM attendance a {where}', params)
+        return self.cursor.fetchone()[0]
+    
+    def iter_attendance(self, start_date=None, end_date=None, student_ids=None, batch_size=1000):
+        """Yield lists of (date, time_in, status, name, student_id, email) rows with fetchmany
+        
+        Rows come in date order. Without student_ids they are read straight
+        from the date index; with them, SQLite sorts the matching rows. Python
+        holds one batch at a time. The query runs on its own cursor, so other
+        calls on this thread can be made between batches.
+        """
+        where, params = self._attendance_filter(start_date, end_date, student_ids)
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(f'''
+                SELECT a.date, a.time_in, a.status, s.name, s.student_id, s.email
+                FROM attendance a
+                JOIN students s ON s.id = a.student_id
+                {where}
+                ORDER BY a.date, a.student_id
+            ''', params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    return
+                yield rows
+        finally:
+            cursor.close()
+    
+    def get_roll_call(self, start_date, end_date=None):
+        """Get (date, present, late, absent, total) for each day with records in a range"""
+        self.cursor.execute('''
+            SELECT date, SUM(status = 'present'), SUM(status = 'late'), SUM(status = 'absent'), COUNT(*)
+            FROM attendance
+            WHERE date BETWEEN ? AND ?
+            GROUP BY date ORDER BY date
+        ''', (start_date, end_date or start_date))
+        return self.cursor.fetchall()
+    
     def update_student(self, student_id, name=None, email=None, student_id_num=None, status=None):
         """Update student information"""
         updates = []
@@ -163,6 +618,7 @@ class AttendanceDatabase:
             self.conn.commit()
             return True, "Student updated successfully"
         except Exception as e:
+            self.conn.rollback()
             return False, str(e)
     
     def delete_student(self, student_id):
@@ -175,15 +631,62 @@ class AttendanceDatabase:
             self.conn.commit()
             return True, "Student deleted successfully"
         except Exception as e:
+            self.conn.rollback()
             return False, str(e)
     
     def close(self):
-        """Close database connection"""
-        if self.conn:
-            self.conn.close()
+        """Close the database connections of every thread"""
+        with self._pool_lock:
+            connections = self._connections
+            self._connections = []
+        for conn, cursor in connections:
+            cursor.close()
+            conn.close()
+        self._local = threading.local()
     
     def __enter__(self):
         return self
     
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Attendance database maintenance")
+    parser.add_argument('--db', default='attendance.db', help="Database file (default: attendance.db)")
+    commands = parser.add_subparsers(dest='command', required=True)
+    
+    commands.add_parser('rebuild-summary', help="Recount per-student totals")
+    
+    today = datetime.now().strftime('%Y-%m-%d')
+    close_out = commands.add_parser('close-out', help="Mark absent/late for a day or a date range")
+    close_out.add_argument('--date', default=today, help="First day, YYYY-MM-DD (default: today)")
+    close_out.add_argument('--to', help="Last day of a backfill range (default: --date)")
+    close_out.add_argument('--session-start', help="HH:MM[:SS]; present marks after it become late")
+    close_out.add_argument('--skip-weekends', action='store_true', help="Do not mark absences on Saturdays and Sundays")
+    
+    roll_call = commands.add_parser('roll-call', help="Print present/late/absent counts per day")
+    roll_call.add_argument('--date', default=today, help="First day, YYYY-MM-DD (default: today)")
+    roll_call.add_argument('--to', help="Last day (default: --date)")
+    args = parser.parse_args(argv)
+    
+    with AttendanceDatabase(args.db) as db:
+        start = time.perf_counter()
+        if args.command == 'rebuild-summary':
+            success, message = db.rebuild_attendance_summary()
+        elif args.command == 'close-out':
+            success, message = db.close_out(args.date, args.to, args.session_start, args.skip_weekends)
+            if success:
+                absent, late = message
+                message = f"Closed out {args.date}{' to ' + args.to if args.to else ''}: {absent} absent, {late} late"
+        else:
+            print(f"{'Date':<12}{'Present':>9}{'Late':>7}{'Absent':>8}{'Total':>7}")
+            for date, present, late, absent, total in db.get_roll_call(args.date, args.to):
+                print(f"{date:<12}{present:>9}{late:>7}{absent:>8}{total:>7}")
+            return 0
+        print(f"{message} ({time.perf_counter() - start:.2f}s)" if success else f"Error: {message}")
+        return 0 if success else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
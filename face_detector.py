@@ -0,0 +1,135 @@
+import threading
+import time
+
+import cv2
+
+
+class DetectionScheduler:
+    """Face detection that avoids running the full cascade on every frame.
+    
+    The cascade runs on a downscaled copy of the frame. Between full
+    detections, each face found is followed by template matching in a small
+    window around its last position. Full detection runs again every
+    full_every frames, when nothing is being tracked, or as soon as a face's
+    match score drops below min_score. Boxes are always returned in
+    full-resolution coordinates, so callers can crop from the original frame.
+    Call it like detectMultiScale: scheduler(gray).
+    """
+    
+    def __init__(self, cascade=None, scale=0.5, scale_factor=1.3, min_neighbors=5,
+                 full_every=10, min_score=0.6, search_margin=0.5, smoothing=0.1):
+        if cascade is None:
+            cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+        self.cascade = cascade
+        self.scale = scale
+        self.scale_factor = scale_factor
+        self.min_neighbors = min_neighbors
+        self.full_every = full_every
+        self.min_score = min_score
+        self.search_margin = search_margin
+        self.smoothing = smoothing
+        
+        # (x, y, w, h, template) in downscaled coordinates
+        self.tracks = []
+        self.frames_since_full = 0
+        self._lock = threading.Lock()
+        
+        # Statistics
+        self.frames = 0
+        self.full_detections = 0
+        self.tracked_frames = 0
+        self.cpu_per_frame = 0.0
+        self.last_mode = None
+    
+    def reset(self):
+        """Forget tracked faces so the next frame runs a full detection"""
+        with self._lock:
+            self.tracks = []
+            self.frames_since_full = 0
+    
+    def __call__(self, gray):
+        return self.detect(gray)
+    
+    def detect(self, gray):
+        """Return face boxes (x, y, w, h) in the coordinates of gray"""
+        start = time.thread_time()
+        with self._lock:
+            small = self._downscale(gray)
+            
+            faces = None
+            if self.tracks and self.frames_since_full < self.full_every:
+                faces = self._track(small)
+            if faces is None:
+                faces = self._detect_full(small)
+                self.full_detections += 1
+                self.frames_since_full = 0
+                self.last_mode = 'full'
+            else:
+                self.tracked_frames += 1
+                self.last_mode = 'tracked'
+            self.frames_since_full += 1
+            self.frames += 1
+            
+            # CPU time of this thread only, so waiting on the camera does not count
+            cpu = time.thread_time() - start
+            if self.frames == 1:
+                self.cpu_per_frame = cpu
+            else:
+                self.cpu_per_frame += self.smoothing * (cpu - self.cpu_per_frame)
+            
+            return [self._to_full(x, y, w, h, gray.shape) for x, y, w, h in faces]
+    
+    def _downscale(self, gray):
+        if self.scale == 1.0:
+            return gray
+        return cv2.resize(gray, None, fx=self.scale, fy=self.scale, interpolation=cv2.INTER_AREA)
+    
+    def _to_full(self, x, y, w, h, shape):
+        rows, cols = shape[:2]
+        fx, fy = int(round(x / self.scale)), int(round(y / self.scale))
+        fw, fh = int(round(w / self.scale)), int(round(h / self.scale))
+        return (fx, fy, min(fw, cols - fx), min(fh, rows - fy))
+    
+    def _detect_full(self, small):
+        found = self.cascade.detectMultiScale(small, self.scale_factor, self.min_neighbors)
+        self.tracks = []
+        for x, y, w, h in found:
+            x, y, w, h = int(x), int(y), int(w), int(h)
+            self.tracks.append((x, y, w, h, small[y:y + h, x:x + w].copy()))
+        return [track[:4] for track in self.tracks]
+    
+    def _track(self, small):
+        """Follow every tracked face; returns None if any of them was lost"""
+        rows, cols = small.shape[:2]
+        tracks = []
+        for x, y, w, h, template in self.tracks:
+            margin_x = int(w * self.search_margin)
+            margin_y = int(h * self.search_margin)
+            left, top = max(0, x - margin_x), max(0, y - margin_y)
+            right, bottom = min(cols, x + w + margin_x), min(rows, y + h + margin_y)
+            if right - left < w or bottom - top < h:
+                return None
+            
+            scores = cv2.matchTemplate(small[top:bottom, left:right], template, cv2.TM_CCOEFF_NORMED)
+            _, score, _, (dx, dy) = cv2.minMaxLoc(scores)
+            if score < self.min_score:
+                return None
+            
+            # Keep the template from the last full detection so errors do not accumulate
+            tracks.append((left + dx, top + dy, w, h, template))
+        
+        self.tracks = tracks
+        return [track[:4] for track in tracks]
+    
+    def get_stats(self):
+        """Get CPU time per frame and how often the full cascade ran"""
+        with self._lock:
+            return {
+                'cpu_ms_per_frame': self.cpu_per_frame * 1000,
+                'frames': self.frames,
+                'full_detections': self.full_detections,
+                'tracked_frames': self.tracked_frames,
+                'full_ratio': self.full_detections / self.frames if self.frames else 0.0,
+                'tracked_faces': len(self.tracks),
+                'last_mode': self.last_mode,
+            }
@@ -0,0 +1,207 @@
+import os
+import pickle
+import threading
+import time
+
+import cv2
+
+from lbph_engine import LBPHMatcher, index_path_for, model_stamp
+
+
+class FaceModelHolder:
+    """Keeps the LBPH histogram index and label map in memory between frames.
+    
+    When the files change while a model is loaded (after retraining, or
+    invalidate()), the new model is loaded on a background thread and
+    swapped in when ready; until then callers keep getting the old one.
+    A load that fails, e.g. on a file that is being replaced, is retried
+    RETRY_DELAY seconds later.
+    """
+    
+    RETRY_DELAY = 2.0
+    
+    def __init__(self, model_path='face_recognizer.yml', labels_path='labels.pkl', shortlist=None):
+        self.model_path = model_path
+        self.labels_path = labels_path
+        self.index_path = index_path_for(model_path)
+        self.shortlist = shortlist
+        self.matcher = None
+        self.label_dict = {}
+        self.id_to_name = {}
+        self.version = 0
+        self._stamp = None
+        self._lock = threading.RLock()
+        self._swap_thread = None
+        self._retry_after = 0.0
+        
+        # Cache statistics
+        self.loads = 0
+        self.hits = 0
+        self.misses = 0
+        self.last_load_time = 0.0
+        self.total_load_time = 0.0
+        self.swaps = 0
+    
+    def current_stamp(self):
+        """Return the (version, model mtime, labels mtime) stamp, or None if files are missing"""
+        try:
+            model_mtime = os.stat(self.model_path).st_mtime_ns
+            labels_mtime = os.stat(self.labels_path).st_mtime_ns
+        except OSError:
+            return None
+        return (self.version, model_mtime, labels_mtime)
+    
+    def is_available(self):
+        """Check if a trained model exists on disk"""
+        return self.current_stamp() is not None
+    
+    def _clear(self):
+        self.matcher = None
+        self.label_dict = {}
+        self.id_to_name = {}
+    
+    def _refresh(self):
+        """Reload the label map and drop cached models if the files changed"""
+        stamp = self.current_stamp()
+        if stamp is None:
+            self._clear()
+            self._stamp = None
+            return False
+        
+        if stamp == self._stamp:
+            self.hits += 1
+            return bool(self.id_to_name)
+        
+        # Keep serving the loaded model while its replacement loads
+        if self.matcher is not None:
+            self.hits += 1
+            if self._swap_thread is None and time.monotonic() >= self._retry_after:
+                self._swap_thread = threading.Thread(target=self._swap, args=(stamp,),
+                                                     name="model-swap", daemon=True)
+                self._swap_thread.start()
+            return bool(self.id_to_name)
+        
+        if time.monotonic() < self._retry_after:
+            return False
+        self.misses += 1
+        self._clear()
+        try:
+            self.label_dict = self._read_labels()
+        except Exception as e:
+            # Try again shortly rather than on every frame
+            print(f"Error loading labels: {e}")
+            self._stamp = None
+            self._retry_after = time.monotonic() + self.RETRY_DELAY
+            return False
+        self._stamp = stamp
+        self.id_to_name = {v: k for k, v in self.label_dict.items()}
+        return True
+    
+    def _read_labels(self):
+        with open(self.labels_path, 'rb') as f:
+            return pickle.load(f)
+    
+    def _read_recognizer(self):
+        recognizer = cv2.face.LBPHFaceRecognizer_create()
+        recognizer.read(self.model_path)
+        return recognizer
+    
+    def build_matcher(self):
+        """Load the saved index, or build and save it from the YAML model"""
+        source_stamp = model_stamp(self.model_path)
+        
+        matcher = LBPHMatcher.load(self.index_path, source_stamp, self.shortlist)
+        if matcher is None:
+            # Parsing the YAML model is the slow part, so keep the result as an index
+            matcher = LBPHMatcher.from_recognizer(self._read_recognizer(), self.shortlist)
+            try:
+                matcher.save(self.index_path, source_stamp)
+            except OSError as e:
+                print(f"Could not save face index: {e}")
+        return matcher
+    
+    def _swap(self, stamp):
+        """Load the changed model off the caller's thread, then swap it in"""
+        start = time.perf_counter()
+        try:
+            label_dict = self._read_labels()
+            matcher = self.build_matcher()
+        except Exception as e:
+            # Keep the old model and try again shortly; the files may be mid-replace
+            print(f"Error reloading face model: {e} (retrying in {self.RETRY_DELAY:g}s)")
+            with self._lock:
+                self._retry_after = time.monotonic() + self.RETRY_DELAY
+                self._swap_thread = None
+            return
+        
+        with self._lock:
+            self._stamp = stamp
+            self.label_dict = label_dict
+            self.id_to_name = {v: k for k, v in label_dict.items()}
+            self.matcher = matcher
+            self._swap_thread = None
+            self.swaps += 1
+            self._record_load(start, "model swap")
+    
+    def get_matcher(self):
+        """Return (matcher, id_to_name), reloading only if the model changed"""
+        with self._lock:
+            if not self._refresh():
+                return None, {}
+            if self.matcher is None and not self.load_matcher():
+                return None, {}
+            return self.matcher, self.id_to_name
+    
+    def _record_load(self, start, what):
+        self.last_load_time = time.perf_counter() - start
+        self.total_load_time += self.last_load_time
+        self.loads += 1
+        print(f"Face {what} loaded in {self.last_load_time:.3f}s ({len(self.label_dict)} people)")
+    
+    def load_matcher(self):
+        """Load the saved histogram index, rebuilding it from the model if it is stale"""
+        with self._lock:
+            start = time.perf_counter()
+            try:
+                matcher = self.build_matcher()
+            except Exception as e:
+                print(f"Error loading face index: {e}")
+                return False
+            
+            self.matcher = matcher
+            self._record_load(start, "index")
+            return True
+    
+    def invalidate(self):
+        """Bump the version stamp so the next get_matcher() reloads (or hot-swaps) the model"""
+        with self._lock:
+            self.version += 1
+    
+    def get_stats(self):
+        """Get load time and cache hit statistics"""
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                'version': self.version,
+                'loads': self.loads,
+                'swaps': self.swaps,
+                'swapping': self._swap_thread is not None,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / requests if requests else 0.0,
+                'last_load_time': self.last_load_time,
+                'total_load_time': self.total_load_time,
+            }
+
+
+_shared_holder = None
+_shared_lock = threading.Lock()
+
+
+def get_model_holder():
+    """Get the model holder shared by all pages in this process"""
+    global _shared_holder
+    with _shared_lock:
+        if _shared_holder is None:
+            _shared_holder = FaceModelHolder()
+        return _shared_holder
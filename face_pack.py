@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Packed Face Dataset
+Stores face samples as fixed-size grayscale crops in one append-only file
+(faces.pack) with a name index (faces.pack.names, one name per record).
+
+Usage:
+    python face_pack.py import [images_dir]   # pack an existing images/ folder
+    python face_pack.py export [images_dir]   # write the pack back out as JPEGs
+    python face_pack.py info
+"""
+
+import os
+import struct
+import sys
+import threading
+
+import cv2
+import numpy as np
+
+
+def normalize_face(face, size):
+    """Resize a grayscale (or BGR) crop to size, as (width, height)"""
+    if face.ndim == 3:
+        face = cv2.cvtColor(face, cv2.COLOR_BGR2GRAY)
+    if (face.shape[1], face.shape[0]) != tuple(size):
+        face = cv2.resize(face, tuple(size), interpolation=cv2.INTER_AREA)
+    return np.ascontiguousarray(face, dtype=np.uint8)
+
+
+class FacePack:
+    """Append-only file of fixed-size uint8 face crops with a name index"""
+    
+    MAGIC = b'FACEPACK'
+    HEADER_FORMAT = '<8sIII'
+    HEADER_SIZE = 32
+    VERSION = 1
+    DEFAULT_PATH = 'faces.pack'
+    
+    def __init__(self, path=DEFAULT_PATH, size=(100, 100)):
+        self.path = path
+        self.names_path = path + '.names'
+        self.size = size
+        self._lock = threading.Lock()
+        self._names = None
+        
+        if os.path.exists(self.path):
+            self._read_header()
+        else:
+            self._write_header()
+    
+    @classmethod
+    def exists(cls, path=DEFAULT_PATH):
+        return os.path.exists(path)
+    
+    @property
+    def record_size(self):
+        width, height = self.size
+        return width * height
+    
+    def _write_header(self):
+        width, height = self.size
+        header = struct.pack(self.HEADER_FORMAT, self.MAGIC, self.VERSION, width, height)
+        with open(self.path, 'wb') as f:
+            f.write(header.ljust(self.HEADER_SIZE, b'\0'))
+        open(self.names_path, 'w', encoding='utf-8').close()
+    
+    def _read_header(self):
+        with open(self.path, 'rb') as f:
+            header = f.read(self.HEADER_SIZE)
+        magic, version, width, height = struct.unpack_from(self.HEADER_FORMAT, header)
+        if magic != self.MAGIC or version != self.VERSION:
+            raise ValueError(f"{self.path} is not a face pack file")
+        self.size = (width, height)
+    
+    def names(self):
+        """Name of every record, in file order"""
+        with self._lock:
+            return list(self._load_names())
+    
+    def _load_names(self):
+        if self._names is None:
+            names = []
+            if os.path.exists(self.names_path):
+                with open(self.names_path, 'r', encoding='utf-8') as f:
+                    names = [line.rstrip('\n') for line in f if line.endswith('\n')]
+            # An interrupted append can leave a crop without a name or vice versa
+            self._names = names[:self._crop_count()]
+        return self._names
+    
+    def _crop_count(self):
+        return max(0, os.path.getsize(self.path) - self.HEADER_SIZE) // self.record_size
+    
+    def __len__(self):
+        return len(self.names())
+    
+    def normalize(self, face):
+        """Resize a grayscale crop to the pack's fixed size"""
+        return normalize_face(face, self.size)
+    
+    def append(self, name, face):
+        """Append one face crop for name"""
+        self.append_many([(name, face)])
+    
+    def append_many(self, samples):
+        """Append (name, face) pairs; crops are written before their names"""
+        if not samples:
+            return
+        with self._lock:
+            names = self._load_names()
+            expected_size = self.HEADER_SIZE + len(names) * self.record_size
+            with open(self.path, 'r+b') as f:
+                # Drop any partial record left by an interrupted write
+                f.truncate(expected_size)
+                f.seek(expected_size)
+                for _, face in samples:
+                    f.write(self.normalize(face).tobytes())
+                f.flush()
+            with open(self.names_path, 'w' if not names else 'a', encoding='utf-8') as f:
+                for name, _ in samples:
+                    f.write(f"{name}\n")
+            names.extend(name for name, _ in samples)
+    
+    def memmap(self):
+        """Memory-map every crop as a read-only (N, height, width) array"""
+        count = len(self.names())
+        width, height = self.size
+        if count == 0:
+            return np.empty((0, height, width), dtype=np.uint8)
+        return np.memmap(self.path, dtype=np.uint8, mode='r', offset=self.HEADER_SIZE,
+                         shape=(count, height, width))
+    
+    def samples(self, name=None):
+        """Return (names, faces) for every record, or only for one person"""
+        names = self.names()
+        crops = self.memmap()
+        if name is None:
+            return names, [crops[i] for i in range(len(names))]
+        indexes = [i for i, sample_name in enumerate(names) if sample_name == name]
+        return [name] * len(indexes), [crops[i] for i in indexes]
+    
+    def import_folder(self, images_path='images'):
+        """Append every <name>_<n>.jpg/png sample in a folder. Returns the count"""
+        samples = []
+        for img_name in sorted(os.listdir(images_path)):
+            if not img_name.lower().endswith(('.jpg', '.jpeg', '.png')):
+                continue
+            name = '_'.join(img_name.split('_')[:-1])
+            img = cv2.imread(os.path.join(images_path, img_name), cv2.IMREAD_GRAYSCALE)
+            if name and img is not None:
+                samples.append((name, img))
+        self.append_many(samples)
+        return len(samples)
+    
+    def export_folder(self, images_path='images'):
+        """Write every record as <name>_<n>.jpg. Returns the count"""
+        os.makedirs(images_path, exist_ok=True)
+        names, faces = self.samples()
+        counters = {}
+        for name, face in zip(names, faces):
+            n = counters.get(name, 0)
+            counters[name] = n + 1
+            cv2.imwrite(os.path.join(images_path, f"{name}_{n}.jpg"), np.asarray(face))
+        return len(names)
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] not in ('import', 'export', 'info'):
+        print(__doc__)
+        return
+    
+    command = sys.argv[1]
+    images_path = sys.argv[2] if len(sys.argv) > 2 else 'images'
+    
+    if command == 'import':
+        if not os.path.exists(images_path):
+            print(f"No '{images_path}' folder found!")
+            return
+        pack = FacePack()
+        count = pack.import_folder(images_path)
+        print(f"Imported {count} sample(s) into {pack.path}")
+    elif command == 'export':
+        if not FacePack.exists():
+            print(f"No {FacePack.DEFAULT_PATH} found!")
+            return
+        count = FacePack().export_folder(images_path)
+        print(f"Exported {count} sample(s) to {images_path}")
+    else:
+        if not FacePack.exists():
+            print(f"No {FacePack.DEFAULT_PATH} found!")
+            return
+        pack = FacePack()
+        names = pack.names()
+        print(f"{pack.path}: {len(names)} sample(s), {len(set(names))} people, "
+              f"crop size {pack.size[0]}x{pack.size[1]}")
+
+
+if __name__ == "__main__":
+    main()
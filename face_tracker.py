@@ -0,0 +1,134 @@
+import itertools
+from collections import deque
+
+UNKNOWN = -1
+
+
+def iou(a, b):
+    """Intersection over union of two (x, y, w, h) boxes"""
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    inter_w = min(ax + aw, bx + bw) - max(ax, bx)
+    inter_h = min(ay + ah, by + bh) - max(ay, by)
+    if inter_w <= 0 or inter_h <= 0:
+        return 0.0
+    inter = inter_w * inter_h
+    return inter / float(aw * ah + bw * bh - inter)
+
+
+class FaceTrack:
+    """One face followed across frames, with its recent recognition votes"""
+    
+    def __init__(self, track_id, box, window):
+        self.id = track_id
+        self.box = box
+        self.votes = deque(maxlen=window)
+        self.missed = 0
+        self.label = UNKNOWN
+        self.name = "Unknown"
+        self.distance = None
+        self.confirmed = False
+        self.marked = False
+
+
+class FaceTracker:
+    """Associates detections with tracks by IoU and votes on each track's identity.
+    
+    A track is recognized on every frame until it is confirmed: the
+    confidence-weighted vote over its last `window` predictions needs at
+    least min_votes predictions and confirm_ratio of the weight for one
+    person. After that, the track keeps its name and no more predictions
+    are made for it until it leaves the frame for more than max_missed
+    frames. Predictions at or above unknown_distance count as Unknown.
+    """
+    
+    def __init__(self, iou_threshold=0.3, max_missed=5, window=10, min_votes=3,
+                 confirm_ratio=0.6, unknown_distance=100):
+        self.iou_threshold = iou_threshold
+        self.max_missed = max_missed
+        self.window = window
+        self.min_votes = min_votes
+        self.confirm_ratio = confirm_ratio
+        self.unknown_distance = unknown_distance
+        self.tracks = []
+        self._ids = itertools.count(1)
+        
+        # Statistics
+        self.predictions = 0
+        self.skipped = 0
+    
+    def reset(self):
+        self.tracks = []
+    
+    def update(self, faces):
+        """Match detections to tracks. Returns the track of each face, in order"""
+        faces = [tuple(int(v) for v in face) for face in faces]
+        pairs = sorted(((iou(track.box, face), t, f)
+                        for t, track in enumerate(self.tracks)
+                        for f, face in enumerate(faces)), reverse=True)
+        
+        assigned = [None] * len(faces)
+        used_tracks = set()
+        for overlap, t, f in pairs:
+            if overlap < self.iou_threshold:
+                break
+            if t in used_tracks or assigned[f] is not None:
+                continue
+            used_tracks.add(t)
+            assigned[f] = self.tracks[t]
+        
+        for t, track in enumerate(self.tracks):
+            if t not in used_tracks:
+                track.missed += 1
+        self.tracks = [track for track in self.tracks if track.missed <= self.max_missed]
+        
+        for f, face in enumerate(faces):
+            track = assigned[f]
+            if track is None:
+                track = FaceTrack(next(self._ids), face, self.window)
+                self.tracks.append(track)
+            else:
+                track.box = face
+                track.missed = 0
+            assigned[f] = track
+        return assigned
+    
+    def pending(self, tracks):
+        """Tracks from update() that still need a prediction"""
+        pending = [track for track in tracks if not track.confirmed]
+        self.predictions += len(pending)
+        self.skipped += len(tracks) - len(pending)
+        return pending
+    
+    def add_prediction(self, track, label, distance):
+        """Add one (label, distance) prediction to a track's vote"""
+        if distance >= self.unknown_distance:
+            label = UNKNOWN
+        track.votes.append((label, distance))
+        
+        # Closer matches count for more; an Unknown vote counts as a weak match
+        weights = {}
+        for vote_label, vote_distance in track.votes:
+            if vote_label == UNKNOWN:
+                weight = 0.5
+            else:
+                weight = 1.0 + (self.unknown_distance - vote_distance) / self.unknown_distance
+            weights[vote_label] = weights.get(vote_label, 0.0) + weight
+        
+        leader = max(weights, key=weights.get)
+        leader_distances = [d for l, d in track.votes if l == leader]
+        track.label = leader
+        track.distance = sum(leader_distances) / len(leader_distances)
+        track.confirmed = (leader != UNKNOWN
+                           and len(track.votes) >= self.min_votes
+                           and weights[leader] >= self.confirm_ratio * sum(weights.values()))
+    
+    def get_stats(self):
+        total = self.predictions + self.skipped
+        return {
+            'tracks': len(self.tracks),
+            'confirmed': sum(1 for track in self.tracks if track.confirmed),
+            'predictions': self.predictions,
+            'skipped': self.skipped,
+            'skip_ratio': self.skipped / total if total else 0.0,
+        }
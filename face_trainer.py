@@ -0,0 +1,217 @@
+import os
+import pickle
+import time
+
+import cv2
+import numpy as np
+
+from lbph_engine import LBPHMatcher, index_path_for, model_stamp
+from training_data import TrainingDataLoader
+
+
+class FaceTrainer:
+    """Trains the LBPH model from the images folder.
+    
+    A full rebuild re-reads every sample, writes the YAML model and saves
+    its histograms as an index next to it. Incremental training adds a new
+    person by appending their histograms to that index, without parsing or
+    rewriting the YAML, which costs as much as a rebuild. Recognition loads
+    the index, so the YAML only catches up at the next full rebuild. Label
+    ids in labels.pkl are append-only: existing people keep their id and
+    new people get the next free one. A full rebuild is needed when
+    someone's samples were removed or replaced. Images are decoded through
+    a TrainingDataLoader, so unchanged files are not decoded again. If a
+    FacePack is given, samples are memory-mapped from it instead.
+    
+    The model, index and labels are written to temporary files and renamed
+    into place, so a reader never sees a half-written file. progress(stage,
+    done, total) is called with 'loading', 'training', 'saving' and
+    'indexing' if given.
+    """
+    
+    def __init__(self, images_path='images', model_path='face_recognizer.yml', labels_path='labels.pkl',
+                 loader=None, pack=None, progress=None):
+        self.images_path = images_path
+        self.model_path = model_path
+        self.labels_path = labels_path
+        self.index_path = index_path_for(model_path)
+        self.loader = loader or TrainingDataLoader()
+        self.pack = pack
+        self.progress = progress
+        self.history = []
+        self.recognizer = None
+        self.matcher = None
+    
+    def _report(self, stage, done=0, total=0):
+        if self.progress:
+            self.progress(stage, done, total)
+    
+    @staticmethod
+    def name_from_filename(img_name):
+        # e.g. "Josh_0.jpg" -> "Josh"
+        return '_'.join(img_name.split('_')[:-1])
+    
+    def load_labels(self):
+        """Load the saved name -> label id mapping"""
+        if not os.path.exists(self.labels_path):
+            return {}
+        with open(self.labels_path, 'rb') as f:
+            return pickle.load(f)
+    
+    def save_labels(self, label_dict):
+        tmp_path = self.labels_path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(label_dict, f)
+        os.replace(tmp_path, self.labels_path)
+    
+    def save_model(self, recognizer, label_dict):
+        """Write the model and labels atomically; the model rename comes last"""
+        self._report('saving')
+        # Keep the extension so OpenCV picks the same file format
+        root, ext = os.path.splitext(self.model_path)
+        tmp_path = f"{root}.tmp{ext}"
+        recognizer.save(tmp_path)
+        # Label ids are append-only, so new labels with the old model are still valid
+        self.save_labels(label_dict)
+        os.replace(tmp_path, self.model_path)
+        self.recognizer = recognizer
+    
+    def save_index(self, matcher):
+        """Save the histogram index, stamped with the model file it extends"""
+        self._report('indexing')
+        matcher.save(self.index_path, model_stamp(self.model_path))
+        self.matcher = matcher
+    
+    def list_samples(self, name=None):
+        """List (name, path) for every sample image, optionally for one person"""
+        if not os.path.exists(self.images_path):
+            raise ValueError("No images directory found!")
+        
+        samples = []
+        for img_name in sorted(os.listdir(self.images_path)):
+            sample_name = self.name_from_filename(img_name)
+            if not sample_name or (name is not None and sample_name != name):
+                continue
+            samples.append((sample_name, os.path.join(self.images_path, img_name)))
+        return samples
+    
+    def face_size(self):
+        """(width, height) the samples are resized to, or None for images at their own size"""
+        return self.pack.size if self.pack else None
+    
+    def sample_names(self):
+        """Names of everyone who has at least one sample"""
+        if self.pack:
+            return set(self.pack.names())
+        return {sample_name for sample_name, _ in self.list_samples()}
+    
+    def read_samples(self, name=None):
+        """Return (names, images) from the face pack or the images folder"""
+        if self.pack:
+            names, images = self.pack.samples(name)
+            self._report('loading', len(images), len(images))
+            return names, images
+        samples = self.list_samples(name)
+        self._report('loading', 0, len(samples))
+        images = self.loader.load([img_path for _, img_path in samples],
+                                  progress=lambda done, total: self._report('loading', done, total))
+        return [sample_name for sample_name, _ in samples], images
+    
+    def load_faces(self, names, images, label_dict):
+        """Pair sample images with label ids, adding new names"""
+        faces = []
+        labels = []
+        next_id = max(label_dict.values(), default=-1) + 1
+        
+        for name, img in zip(names, images):
+            if img is None:
+                continue
+            
+            if name not in label_dict:
+                label_dict[name] = next_id
+                next_id += 1
+            
+            faces.append(img)
+            labels.append(label_dict[name])
+        return faces, labels
+    
+    def train(self, name=None):
+        """Train incrementally for one person if possible, otherwise rebuild"""
+        if name is None:
+            return self.train_full()
+        
+        if not os.path.exists(self.model_path) or not os.path.exists(self.labels_path):
+            return self.train_full()
+        
+        # Re-registering overwrites samples, and their old histograms must go
+        known_names = set(self.load_labels())
+        if name in known_names:
+            return self.train_full()
+        
+        # Samples were deleted for someone in the model, so their histograms must go
+        if known_names - self.sample_names():
+            return self.train_full()
+        
+        return self.train_person(name)
+    
+    def train_full(self):
+        """Retrain the recognizer from every sample in the images folder"""
+        start = time.perf_counter()
+        names, images = self.read_samples()
+        
+        # Keep ids of people who still have samples; drop deleted people
+        present_names = set(names)
+        label_dict = {n: i for n, i in self.load_labels().items() if n in present_names}
+        
+        faces, labels = self.load_faces(names, images, label_dict)
+        if len(faces) == 0:
+            raise ValueError("No faces found for training!")
+        
+        self._report('training', 0, len(faces))
+        recognizer = cv2.face.LBPHFaceRecognizer_create()
+        recognizer.train(faces, np.array(labels))
+        self.save_model(recognizer, label_dict)
+        self.save_index(LBPHMatcher.from_recognizer(recognizer, face_size=self.face_size()))
+        if not self.pack:
+            self.loader.prune()
+        
+        return self._record('full', start, label_dict, len(faces))
+    
+    def train_person(self, name):
+        """Append a new person's histograms to the saved index"""
+        start = time.perf_counter()
+        matcher = LBPHMatcher.load(self.index_path, model_stamp(self.model_path))
+        if matcher is None or matcher.face_size != self.face_size():
+            # No index for this model (parsing the YAML costs as much as a rebuild),
+            # or it was trained on crops of another size
+            return self.train_full()
+        label_dict = self.load_labels()
+        
+        faces, labels = self.load_faces(*self.read_samples(name), label_dict)
+        if len(faces) == 0:
+            raise ValueError(f"No faces found for {name}!")
+        
+        self._report('training', 0, len(faces))
+        matcher = matcher.with_samples(faces, labels)
+        # Index first: the new labels are what makes model holders reload
+        self.save_index(matcher)
+        self.save_labels(label_dict)
+        
+        return self._record('incremental', start, label_dict, len(faces))
+    
+    def _record(self, mode, start, label_dict, samples):
+        result = {
+            'mode': mode,
+            'people': len(label_dict),
+            'samples': samples,
+            'seconds': time.perf_counter() - start,
+        }
+        if not self.pack:
+            result.update({
+                'load_seconds': self.loader.last_load_time,
+                'decoded': self.loader.decoded,
+                'cache_hits': self.loader.cache_hits,
+            })
+        self.history.append(result)
+        print(f"Model trained ({mode}): {samples} samples, {len(label_dict)} people in {result['seconds']:.2f}s")
+        return result
@@ -0,0 +1,84 @@
+import time
+
+import cv2
+import numpy as np
+
+
+class PPMEncoder:
+    """Turns BGR frames into binary PPM images for Tk, reusing one output buffer.
+    
+    The RGB pixels are written with cvtColor/resize dst= straight into a
+    bytearray that already holds the PPM header, so a frame costs one
+    conversion and one bytes() copy. The bytes can be handed to another
+    thread safely because the buffer is never shared.
+    """
+    
+    def __init__(self, display_size=(640, 480)):
+        self.display_size = display_size
+        width, height = display_size
+        header = f"P6 {width} {height} 255 ".encode('ascii')
+        self._ppm = bytearray(len(header) + width * height * 3)
+        self._ppm[:len(header)] = header
+        self.pixels = np.frombuffer(self._ppm, dtype=np.uint8, offset=len(header)).reshape(height, width, 3)
+        self._resized = None
+    
+    def encode(self, frame, draw=None):
+        """Encode a BGR frame; draw(pixels) may annotate the RGB pixels first"""
+        width, height = self.display_size
+        if (frame.shape[1], frame.shape[0]) != self.display_size:
+            self._resized = cv2.resize(frame, (width, height), dst=self._resized)
+            frame = self._resized
+        cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self.pixels)
+        if draw is not None:
+            draw(self.pixels)
+        return bytes(self._ppm)
+
+
+class FrameDisplay:
+    """Shows PPM frames in a Tk label through a single reused PhotoImage.
+    
+    The display rate is capped at max_fps and drops further when updating
+    the image itself gets slow, independently of how fast frames are
+    processed. Frames that arrive between two display ticks are skipped.
+    """
+    
+    def __init__(self, label, display_size=(640, 480), max_fps=30, min_fps=5, smoothing=0.2):
+        self.label = label
+        self.display_size = display_size
+        self.max_fps = max_fps
+        self.min_fps = min_fps
+        self.smoothing = smoothing
+        self.photo = None
+        self.show_time = 0.0
+        self.shown = 0
+    
+    def show(self, ppm):
+        """Display one PPM frame (Tk thread only)"""
+        import tkinter as tk
+        
+        start = time.perf_counter()
+        if self.photo is None:
+            width, height = self.display_size
+            self.photo = tk.PhotoImage(master=self.label, width=width, height=height)
+            self.label.configure(image=self.photo)
+            self.label.imgtk = self.photo
+        self.photo.configure(data=ppm, format='PPM')
+        
+        elapsed = time.perf_counter() - start
+        if self.shown == 0:
+            self.show_time = elapsed
+        else:
+            self.show_time += self.smoothing * (elapsed - self.show_time)
+        self.shown += 1
+    
+    def clear(self):
+        """Drop the image so the label can be blanked"""
+        self.photo = None
+        self.shown = 0
+    
+    def next_delay(self):
+        """Milliseconds until the next display tick"""
+        # Keep image updates under about half of the Tk thread's time
+        interval = max(1.0 / self.max_fps, 2.0 * self.show_time)
+        interval = min(interval, 1.0 / self.min_fps)
+        return max(1, int(interval * 1000))
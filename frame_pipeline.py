@@ -0,0 +1,248 @@
+import queue
+import threading
+import time
+
+import cv2
+
+from frame_display import PPMEncoder
+from perf_monitor import get_perf_monitor
+
+
+class StageStats:
+    """Rolling FPS counter and smoothed per-stage latency"""
+    
+    def __init__(self, smoothing=0.1):
+        self.smoothing = smoothing
+        self.latency = {}
+        self._lock = threading.Lock()
+        self._counts = {}
+        self._rates = {}
+        self._window_start = time.perf_counter()
+    
+    def record(self, stage, seconds):
+        """Record how long a stage took (exponential moving average)"""
+        with self._lock:
+            previous = self.latency.get(stage)
+            if previous is None:
+                self.latency[stage] = seconds
+            else:
+                self.latency[stage] = previous + self.smoothing * (seconds - previous)
+    
+    def tick(self, counter):
+        """Count one event for an FPS counter"""
+        with self._lock:
+            self._counts[counter] = self._counts.get(counter, 0) + 1
+            now = time.perf_counter()
+            elapsed = now - self._window_start
+            if elapsed >= 1.0:
+                self._rates = {name: count / elapsed for name, count in self._counts.items()}
+                self._counts = {}
+                self._window_start = now
+    
+    def rate(self, counter):
+        with self._lock:
+            return self._rates.get(counter, 0.0)
+    
+    def snapshot(self):
+        with self._lock:
+            return {
+                'fps': dict(self._rates),
+                'latency_ms': {stage: value * 1000 for stage, value in self.latency.items()},
+            }
+
+
+class FramePipeline:
+    """Captures and processes camera frames on background threads.
+    
+    The capture thread reads frames into a small bounded queue and drops the
+    oldest frame when the worker falls behind. The worker runs detection and
+    the page's process callback, then keeps only the newest annotated frame
+    for the Tk side to display, as PPM bytes for a FrameDisplay. A display
+    frame is only encoded once the previous one was taken, so the display
+    rate does not add work to the worker. Frame and grayscale buffers are
+    recycled instead of being allocated per frame. Widget updates made from
+    the worker must go through call_soon() so they run on the Tk thread.
+    Per-stage timings also go to a PerfMonitor when it is enabled.
+    """
+    
+    def __init__(self, source=0, detect=None, process=None, queue_size=2,
+                 display_size=(640, 480), flip=True, monitor=None):
+        self.source = source
+        self.detect = detect
+        self.process = process
+        self.display_size = display_size
+        self.flip = flip
+        
+        self.cap = None
+        self.running = False
+        self.failed = False
+        self.frames = queue.Queue(maxsize=queue_size)
+        self.ui_calls = queue.SimpleQueue()
+        self.stats = StageStats()
+        self.monitor = monitor or get_perf_monitor()
+        self.dropped = 0
+        self.encoder = PPMEncoder(display_size)
+        
+        # Frame buffers go back here once processed or dropped
+        self._free_frames = queue.SimpleQueue()
+        self._gray = None
+        
+        self._latest = None
+        self._latest_lock = threading.Lock()
+        self._threads = []
+    
+    def start(self):
+        """Open the video source and start the threads. Returns False if it cannot be opened"""
+        self.cap = cv2.VideoCapture(self.source)
+        if not self.cap.isOpened():
+            self.cap.release()
+            self.cap = None
+            return False
+        
+        self.running = True
+        self.failed = False
+        self._threads = [
+            threading.Thread(target=self._capture_loop, name="frame-capture", daemon=True),
+            threading.Thread(target=self._process_loop, name="frame-process", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+        return True
+    
+    def stop(self):
+        """Stop the threads and release the video source"""
+        self.running = False
+        current = threading.current_thread()
+        for thread in self._threads:
+            if thread is not current:
+                thread.join(timeout=2.0)
+        self._threads = []
+        
+        if self.cap:
+            self.cap.release()
+            self.cap = None
+        
+        with self._latest_lock:
+            self._latest = None
+    
+    def call_soon(self, callback, *args, **kwargs):
+        """Queue a callback to run on the Tk thread on the next display tick"""
+        self.ui_calls.put((callback, args, kwargs))
+    
+    def run_ui_callbacks(self):
+        """Run queued UI callbacks. Must be called from the Tk thread"""
+        while True:
+            try:
+                callback, args, kwargs = self.ui_calls.get_nowait()
+            except queue.Empty:
+                return
+            callback(*args, **kwargs)
+    
+    def get_latest(self):
+        """Take the newest display-ready PPM frame, or None if nothing new arrived"""
+        with self._latest_lock:
+            frame = self._latest
+            self._latest = None
+        return frame
+    
+    def get_stats(self):
+        """Get capture/processed FPS, dropped frame count and per-stage latency"""
+        stats = self.stats.snapshot()
+        stats['capture_fps'] = stats['fps'].get('capture', 0.0)
+        stats['processed_fps'] = stats['fps'].get('processed', 0.0)
+        stats['dropped'] = self.dropped
+        stats['queue_depth'] = self.frames.qsize()
+        if hasattr(self.detect, 'get_stats'):
+            stats['detector'] = self.detect.get_stats()
+        return stats
+    
+    def _take_buffer(self):
+        try:
+            return self._free_frames.get_nowait()
+        except queue.Empty:
+            return None
+    
+    def _capture_loop(self):
+        scratch = None
+        while self.running:
+            start = time.perf_counter()
+            if self.flip:
+                ret, scratch = self.cap.read(scratch)
+            else:
+                ret, frame = self.cap.read(self._take_buffer())
+            read = time.perf_counter()
+            if not ret:
+                self.failed = True
+                self.running = False
+                return
+            if self.flip:
+                frame = cv2.flip(scratch, 1, dst=self._take_buffer())
+            self.stats.record('capture', time.perf_counter() - start)
+            self.monitor.record('read', read - start)
+            self.stats.tick('capture')
+            
+            # Drop the oldest frame when the worker is behind
+            while True:
+                try:
+                    self.frames.put_nowait(frame)
+                    break
+                except queue.Full:
+                    try:
+                        self._free_frames.put(self.frames.get_nowait())
+                        self.dropped += 1
+                    except queue.Empty:
+                        pass
+    
+    def _process_loop(self):
+        while self.running:
+            try:
+                frame = self.frames.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            
+            monitor = self.monitor
+            monitor.profile_tick()
+            start = time.perf_counter()
+            gray = self._gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=self._gray)
+            converted = time.perf_counter()
+            faces = self.detect(gray) if self.detect else ()
+            detected = time.perf_counter()
+            self.stats.record('detect', detected - start)
+            
+            if self.process:
+                try:
+                    self.process(frame, gray, faces)
+                except Exception as e:
+                    print(f"Error processing frame: {e}")
+            processed = time.perf_counter()
+            self.stats.record('process', processed - detected)
+            
+            # Encode for display only if the last display frame was taken
+            with self._latest_lock:
+                display_idle = self._latest is None
+            ppm = None
+            if display_idle:
+                draw = None
+                if monitor.overlay:
+                    fps = self.stats.rate('processed')
+                    draw = lambda pixels: monitor.draw_overlay(pixels, fps)
+                ppm = self.encoder.encode(frame, draw)
+            self._free_frames.put(frame)
+            finished = time.perf_counter()
+            if ppm is not None:
+                self.stats.record('convert', finished - processed)
+            self.stats.record('total', finished - start)
+            self.stats.tick('processed')
+            
+            if monitor.enabled:
+                monitor.record('gray', converted - start)
+                monitor.record('detect', detected - converted)
+                monitor.record('process', processed - detected)
+                if ppm is not None:
+                    monitor.record('display', finished - processed)
+                monitor.record('total', finished - start)
+                monitor.maybe_export()
+            
+            if ppm is not None:
+                with self._latest_lock:
+                    self._latest = ppm
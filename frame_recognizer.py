@@ -0,0 +1,128 @@
+import os
+import time
+
+import cv2
+
+from face_detector import DetectionScheduler
+from face_model import get_model_holder
+from face_pack import normalize_face
+from face_tracker import FaceTracker
+from lbph_engine import rank_faces
+from perf_monitor import get_perf_monitor
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+
+class FrameRecognizer:
+    """Detection, tracking and recognition for one video stream, without any UI.
+    
+    process() takes a grayscale frame and returns the face tracks in it,
+    plus the names whose tracks were confirmed on this frame. Each track
+    reports its name once, so the caller can mark attendance directly.
+    recognize() does the same for faces that were already detected.
+    """
+    
+    def __init__(self, model=None, detector=None, tracker=None, monitor=None):
+        self.model = model or get_model_holder()
+        self.detector = detector or DetectionScheduler()
+        self.tracker = tracker or FaceTracker()
+        self.monitor = monitor or get_perf_monitor()
+    
+    def reset(self):
+        self.detector.reset()
+        self.tracker.reset()
+    
+    def process(self, gray):
+        """Detect and recognize faces in one grayscale frame. Returns (tracks, newly confirmed names)"""
+        return self.recognize(gray, self.detector(gray))
+    
+    def recognize(self, gray, faces):
+        """Recognize already detected faces. Returns (tracks, newly confirmed names)"""
+        tracks = self.tracker.update(rank_faces(faces))
+        
+        matcher, id_to_name = self.model.get_matcher()
+        if matcher is None:
+            return tracks, []
+        
+        # Only faces whose identity is not confirmed yet, in one batched pass
+        pending = self.tracker.pending(tracks)
+        if pending:
+            with self.monitor.stage('predict'):
+                crops = [gray[y:y+h, x:x+w] for (x, y, w, h) in (track.box for track in pending)]
+                # A model trained from the face pack saw fixed-size crops, so queries must match
+                if matcher.face_size:
+                    crops = [normalize_face(crop, matcher.face_size) for crop in crops]
+                predictions = matcher.predict_batch(crops)
+            for track, (id_, confidence) in zip(pending, predictions):
+                self.tracker.add_prediction(track, id_, confidence)
+        
+        names = []
+        for track in tracks:
+            track.name = id_to_name.get(track.label, "Unknown")
+            if track.confirmed and not track.marked:
+                track.marked = True
+                names.append(track.name)
+        return tracks, names
+    
+    def get_stats(self):
+        stats = {'detector': self.detector.get_stats()}
+        stats.update(self.tracker.get_stats())
+        return stats
+
+
+def parse_source(source):
+    """Camera index for a numeric string, otherwise the path or URL itself"""
+    if isinstance(source, str) and source.isdigit():
+        return int(source)
+    return source
+
+
+def is_image_dir(source):
+    return isinstance(source, str) and os.path.isdir(source)
+
+
+def iter_frames(source, stride=1, start_frame=0, end_frame=None):
+    """Yield (frame index, seconds into the source, BGR frame) from a camera, video or image folder.
+    
+    Only every stride-th frame is yielded. For a folder, every image is one
+    frame and the timestamp is the file's modification time.
+    """
+    if is_image_dir(source):
+        files = sorted(f for f in os.listdir(source) if f.lower().endswith(IMAGE_EXTENSIONS))
+        for index in range(start_frame, len(files) if end_frame is None else min(end_frame, len(files)), stride):
+            path = os.path.join(source, files[index])
+            frame = cv2.imread(path)
+            if frame is not None:
+                yield index, os.path.getmtime(path), frame
+        return
+    
+    cap = cv2.VideoCapture(source)
+    if not cap.isOpened():
+        raise ValueError(f"Could not open video source {source!r}")
+    try:
+        live = isinstance(source, int)
+        if start_frame:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+        fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
+        started = time.time()
+        index = start_frame
+        while end_frame is None or index < end_frame:
+            # grab() skips decoding frames that are not used
+            if (index - start_frame) % stride:
+                if not cap.grab():
+                    return
+                index += 1
+                continue
+            ret, frame = cap.read()
+            if not ret:
+                return
+            if live:
+                seconds = time.time() - started
+            elif fps > 0:
+                seconds = index / fps
+            else:
+                seconds = cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+            yield index, seconds, frame
+            index += 1
+    finally:
+        cap.release()
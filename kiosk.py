@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Headless Kiosk Mode
+Runs detection, recognition and attendance marking without the Tk window,
+for door-mounted units with no display.
+
+Usage:
+    python -m kiosk [--source 0] [--log-interval 10] [--max-frames N]
+                    [--perf-log perf.jsonl] [--profile SECONDS]
+    python main.py --headless [same options]
+
+--source can be a camera index, a video file or stream URL, or a folder of images.
+"""
+
+import argparse
+import time
+
+import cv2
+
+from attendance_sink import get_attendance_sink
+from face_tracker import FaceTracker
+from frame_recognizer import FrameRecognizer, is_image_dir, iter_frames, parse_source
+from perf_monitor import get_perf_monitor
+
+
+class KioskRunner:
+    """Recognition loop that marks attendance and logs throughput to stdout"""
+    
+    def __init__(self, source=0, flip=None, log_interval=10.0, sink=None, recognizer=None):
+        self.source = parse_source(source)
+        # Registration samples come from the mirrored camera preview
+        self.flip = isinstance(self.source, int) if flip is None else flip
+        self.log_interval = log_interval
+        self.sink = sink or get_attendance_sink()
+        
+        # Images in a folder are unrelated stills: no tracking, one prediction each
+        self.stills = is_image_dir(self.source)
+        if recognizer is None:
+            recognizer = FrameRecognizer(tracker=FaceTracker(min_votes=1) if self.stills else None)
+        self.recognizer = recognizer
+        self.monitor = get_perf_monitor()
+        
+        self.frames = 0
+        self.marked = 0
+        self.running = False
+    
+    def run(self, max_frames=None):
+        """Process frames until the source ends, max_frames is reached or stop() is called"""
+        if not self.recognizer.model.is_available():
+            print("No trained model found! Please register faces first.")
+            return False
+        
+        self.running = True
+        started = time.perf_counter()
+        window_start, window_frames = started, 0
+        print(f"Kiosk running on source {self.source!r}")
+        
+        try:
+            for _, _, frame in iter_frames(self.source):
+                if not self.running:
+                    break
+                self.monitor.profile_tick()
+                if self.flip:
+                    frame = cv2.flip(frame, 1)
+                with self.monitor.stage('gray'):
+                    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+                
+                if self.stills:
+                    self.recognizer.reset()
+                with self.monitor.stage('process'):
+                    _, names = self.recognizer.process(gray)
+                for name in names:
+                    success, message = self.sink.mark_name(name)
+                    if success:
+                        self.marked += 1
+                        print(f"Marked {name}: {message}")
+                
+                self.frames += 1
+                window_frames += 1
+                now = time.perf_counter()
+                if now - window_start >= self.log_interval:
+                    self.log_throughput(window_frames / (now - window_start))
+                    window_start, window_frames = now, 0
+                self.monitor.maybe_export()
+                if max_frames is not None and self.frames >= max_frames:
+                    break
+        except ValueError as e:
+            print(e)
+            return False
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.running = False
+            self.sink.flush()
+        
+        elapsed = time.perf_counter() - started
+        print(f"Processed {self.frames} frames in {elapsed:.1f}s "
+              f"({self.frames / elapsed if elapsed else 0.0:.1f} FPS), {self.marked} marked")
+        return True
+    
+    def stop(self):
+        self.running = False
+    
+    def log_throughput(self, fps):
+        stats = self.recognizer.get_stats()
+        print(f"{fps:6.1f} FPS | detect {stats['detector']['cpu_ms_per_frame']:.1f} ms CPU/frame, "
+              f"{stats['detector']['full_ratio']:.0%} full | {stats['tracks']} tracks, "
+              f"{stats['skip_ratio']:.0%} predictions skipped | {self.marked} marked")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run attendance recognition without the GUI")
+    parser.add_argument('--source', default='0', help="Camera index, video file/URL or image folder")
+    parser.add_argument('--flip', dest='flip', action='store_true', default=None,
+                        help="Mirror frames (default: only for cameras)")
+    parser.add_argument('--no-flip', dest='flip', action='store_false')
+    parser.add_argument('--log-interval', type=float, default=10.0, help="Seconds between throughput logs")
+    parser.add_argument('--max-frames', type=int, help="Stop after this many frames")
+    parser.add_argument('--perf-log', help="Append per-stage p50/p95/p99 timings to this JSONL file")
+    parser.add_argument('--profile', type=float, metavar='SECONDS',
+                        help="Run cProfile for the first SECONDS and save perf_profile.prof")
+    args = parser.parse_args(argv)
+    
+    monitor = get_perf_monitor()
+    if args.perf_log:
+        monitor.enabled = True
+        monitor.log_path = args.perf_log
+        monitor.log_interval = args.log_interval
+    if args.profile:
+        monitor.request_profile(args.profile)
+    
+    runner = KioskRunner(args.source, args.flip, args.log_interval)
+    return 0 if runner.run(args.max_frames) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
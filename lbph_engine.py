@@ -0,0 +1,254 @@
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+# OpenCV reports "no match" as label -1 with DBL_MAX distance
+NO_MATCH = (-1, sys.float_info.max)
+
+
+def index_path_for(model_path):
+    """The histogram index is saved next to the model file"""
+    return os.path.splitext(model_path)[0] + '_index.npz'
+
+
+def model_stamp(model_path):
+    """(mtime, size) of a model file; an index records the stamp of the model it belongs to"""
+    st = os.stat(model_path)
+    return (st.st_mtime_ns, st.st_size)
+
+
+def lbp_image(face, radius=1, neighbors=8):
+    """Extended (circular) LBP codes of a grayscale face, as computed by OpenCV's LBPH"""
+    src = np.asarray(face, dtype=np.float32)
+    rows, cols = src.shape
+    height, width = rows - 2 * radius, cols - 2 * radius
+    if height <= 0 or width <= 0:
+        return np.zeros((0, 0), dtype=np.int32)
+    
+    center = src[radius:radius + height, radius:radius + width]
+    codes = np.zeros((height, width), dtype=np.int32)
+    eps = np.finfo(np.float32).eps
+    
+    def shifted(dy, dx):
+        return src[radius + dy:radius + dy + height, radius + dx:radius + dx + width]
+    
+    for n in range(neighbors):
+        # Same sample point and bilinear weights as OpenCV's elbp_()
+        x = np.float32(radius * np.cos(2.0 * np.pi * n / float(neighbors)))
+        y = np.float32(-radius * np.sin(2.0 * np.pi * n / float(neighbors)))
+        fx, fy = int(np.floor(x)), int(np.floor(y))
+        cx, cy = int(np.ceil(x)), int(np.ceil(y))
+        ty = np.float32(y - fy)
+        tx = np.float32(x - fx)
+        w1 = (1 - tx) * (1 - ty)
+        w2 = tx * (1 - ty)
+        w3 = (1 - tx) * ty
+        w4 = tx * ty
+        
+        t = w1 * shifted(fy, fx) + w2 * shifted(fy, cx) + w3 * shifted(cy, fx) + w4 * shifted(cy, cx)
+        codes |= ((t > center) | (np.abs(t - center) < eps)).astype(np.int32) << n
+    return codes
+
+
+def spatial_histogram(codes, num_patterns=256, grid_x=8, grid_y=8):
+    """Concatenated, per-cell normalised histograms of LBP codes (grid rows first)"""
+    cell_h = codes.shape[0] // grid_y
+    cell_w = codes.shape[1] // grid_x
+    cells = grid_x * grid_y
+    if cell_h == 0 or cell_w == 0:
+        return np.zeros(cells * num_patterns, dtype=np.float32)
+    
+    grid = codes[:cell_h * grid_y, :cell_w * grid_x]
+    grid = grid.reshape(grid_y, cell_h, grid_x, cell_w).transpose(0, 2, 1, 3).reshape(cells, -1)
+    offsets = (np.arange(cells, dtype=np.int64) * num_patterns)[:, None]
+    counts = np.bincount((grid + offsets).ravel(), minlength=cells * num_patterns)
+    return (counts / np.float32(cell_h * cell_w)).astype(np.float32)
+
+
+def lbph_histograms(faces, radius=1, neighbors=8, grid_x=8, grid_y=8):
+    """LBPH feature vectors for a list of faces, as one (len(faces), D) float32 matrix"""
+    num_patterns = 2 ** neighbors
+    features = np.empty((len(faces), grid_x * grid_y * num_patterns), dtype=np.float32)
+    for i, face in enumerate(faces):
+        features[i] = spatial_histogram(lbp_image(face, radius, neighbors), num_patterns, grid_x, grid_y)
+    return features
+
+
+def chi_square_distances(queries, histograms_t, row_sums=None, columns=None, chunk_elements=1 << 18):
+    """Chi-square (HISTCMP_CHISQR_ALT) distance of every query to every stored histogram
+    
+    histograms_t is the (D, N) transposed matrix of stored histograms; columns
+    optionally restricts the search to some of them. Bins where the query is
+    zero contribute the stored value itself, so only the query's non-zero
+    bins need to be visited:
+        
+        d = 2 * (sum(h) + sum over q > 0 of q * (q - 3h) / (q + h))
+    """
+    queries = np.asarray(queries, dtype=np.float32)
+    if row_sums is None:
+        row_sums = histograms_t.sum(axis=0, dtype=np.float64)
+    if columns is not None:
+        row_sums = row_sums[columns]
+    count = len(row_sums)
+    distances = np.empty((len(queries), count), dtype=np.float64)
+    chunk = max(1, chunk_elements // max(1, count))
+    
+    for i, query in enumerate(queries):
+        bins = np.flatnonzero(query)
+        total = np.array(row_sums, dtype=np.float64)
+        for start in range(0, len(bins), chunk):
+            idx = bins[start:start + chunk]
+            h = histograms_t[idx] if columns is None else histograms_t[np.ix_(idx, columns)]
+            q = query[idx][:, None]
+            total += (q * (q - 3 * h) / (q + h)).sum(axis=0, dtype=np.float64)
+        distances[i] = 2.0 * total
+    return distances
+
+
+class LBPHMatcher:
+    """In-memory LBPH histogram index with batched nearest-neighbour search.
+    
+    The trained histograms are held as one contiguous float32 matrix. By
+    default every query is compared with every stored histogram, which gives
+    the same (label, distance) as recognizer.predict(). With shortlist=k, a
+    query is first compared with each person's mean histogram and only the
+    samples of the k closest people are searched exactly; this is faster for
+    large rosters but can miss a match that the full search would find.
+    The index can be saved next to the model so it loads without parsing the
+    YAML file. face_size is the (width, height) the training crops were
+    resized to, if they were (see face_pack.py); queries must be resized
+    the same way.
+    """
+    
+    def __init__(self, histograms_t, labels, radius=1, neighbors=8, grid_x=8, grid_y=8,
+                 threshold=NO_MATCH[1], shortlist=None, face_size=None):
+        self.radius = radius
+        self.neighbors = neighbors
+        self.grid_x = grid_x
+        self.grid_y = grid_y
+        self.threshold = threshold
+        self.shortlist = shortlist
+        self.face_size = tuple(face_size) if face_size else None
+        
+        # Stored transposed (D, N) so a query's non-zero bins are contiguous rows
+        self.histograms_t = np.ascontiguousarray(histograms_t, dtype=np.float32)
+        self.row_sums = self.histograms_t.sum(axis=0, dtype=np.float64)
+        self.labels = np.asarray(labels, dtype=np.int32).ravel()
+        self.people = len(np.unique(self.labels))
+        
+        self._centroids_t = None
+        self._centroid_sums = None
+        self._centroid_labels = None
+        self._columns_by_centroid = None
+    
+    @classmethod
+    def from_recognizer(cls, recognizer, shortlist=None, face_size=None):
+        """Export a trained cv2.face.LBPHFaceRecognizer into a matcher"""
+        neighbors = recognizer.getNeighbors()
+        dims = recognizer.getGridX() * recognizer.getGridY() * 2 ** neighbors
+        histograms = recognizer.getHistograms()
+        histograms_t = np.empty((dims, len(histograms)), dtype=np.float32)
+        for i, histogram in enumerate(histograms):
+            histograms_t[:, i] = histogram.ravel()
+        return cls(histograms_t, recognizer.getLabels(), recognizer.getRadius(), neighbors,
+                   recognizer.getGridX(), recognizer.getGridY(), recognizer.getThreshold(), shortlist,
+                   face_size)
+    
+    def save(self, path, source_stamp=()):
+        """Save the index; source_stamp identifies the model file it was built from"""
+        # A unique temporary name, since the trainer and model holders may save at the same time
+        fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(path) + '.', suffix='.tmp',
+                                        dir=os.path.dirname(path) or '.')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(f, histograms_t=self.histograms_t, labels=self.labels,
+                         params=np.array([self.radius, self.neighbors, self.grid_x, self.grid_y]),
+                         threshold=np.array(self.threshold), face_size=np.array(self.face_size or (0, 0)),
+                         source_stamp=np.array(source_stamp, dtype=np.int64))
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+    
+    @classmethod
+    def load(cls, path, source_stamp=None, shortlist=None):
+        """Load a saved index, or return None if it is missing or was built from another model"""
+        try:
+            with np.load(path) as data:
+                if source_stamp is not None and tuple(data['source_stamp']) != tuple(source_stamp):
+                    return None
+                radius, neighbors, grid_x, grid_y = (int(v) for v in data['params'])
+                face_size = tuple(int(v) for v in data['face_size']) if 'face_size' in data.files else ()
+                return cls(data['histograms_t'], data['labels'], radius, neighbors, grid_x, grid_y,
+                           float(data['threshold']), shortlist, face_size if any(face_size) else None)
+        except (OSError, KeyError, ValueError):
+            return None
+    
+    def __len__(self):
+        return len(self.labels)
+    
+    def features(self, faces):
+        return lbph_histograms(faces, self.radius, self.neighbors, self.grid_x, self.grid_y)
+    
+    def with_samples(self, faces, labels):
+        """Return a new matcher holding these faces' histograms after the current ones"""
+        histograms_t = np.concatenate([self.histograms_t, self.features(faces).T], axis=1)
+        labels = np.concatenate([self.labels, np.asarray(labels, dtype=np.int32).ravel()])
+        return LBPHMatcher(histograms_t, labels, self.radius, self.neighbors, self.grid_x, self.grid_y,
+                           self.threshold, self.shortlist, self.face_size)
+    
+    def _build_centroids(self):
+        """Per-person mean histograms used to shortlist candidates"""
+        order = np.argsort(self.labels, kind='stable')
+        centroid_labels, starts = np.unique(self.labels[order], return_index=True)
+        self._columns_by_centroid = np.split(order, starts[1:])
+        self._centroids_t = np.empty((self.histograms_t.shape[0], len(centroid_labels)), dtype=np.float32)
+        for i, columns in enumerate(self._columns_by_centroid):
+            self._centroids_t[:, i] = self.histograms_t[:, columns].mean(axis=1)
+        self._centroid_sums = self._centroids_t.sum(axis=0, dtype=np.float64)
+        self._centroid_labels = centroid_labels
+    
+    def _candidate_columns(self, query):
+        if self._centroids_t is None:
+            self._build_centroids()
+        distances = chi_square_distances(query[None, :], self._centroids_t, self._centroid_sums)[0]
+        nearest = np.argpartition(distances, self.shortlist - 1)[:self.shortlist]
+        return np.sort(np.concatenate([self._columns_by_centroid[i] for i in nearest]))
+    
+    def predict_batch(self, faces):
+        """Return [(label, distance)] for each face; (-1, DBL_MAX) when nothing is under threshold"""
+        if len(faces) == 0:
+            return []
+        if len(self.labels) == 0:
+            return [NO_MATCH] * len(faces)
+        
+        features = self.features(faces)
+        if self.shortlist and self.shortlist < self.people:
+            candidates = []
+            for query in features:
+                columns = self._candidate_columns(query)
+                row = chi_square_distances(query[None, :], self.histograms_t, self.row_sums, columns)[0]
+                candidates.append((row, columns))
+        else:
+            candidates = [(row, None) for row in chi_square_distances(features, self.histograms_t, self.row_sums)]
+        
+        results = []
+        for row, columns in candidates:
+            best = int(np.argmin(row))
+            if row[best] < self.threshold:
+                column = best if columns is None else columns[best]
+                results.append((int(self.labels[column]), float(row[best])))
+            else:
+                results.append(NO_MATCH)
+        return results
+    
+    def predict(self, face):
+        return self.predict_batch([face])[0]
+
+
+def rank_faces(faces):
+    """Sort detections by area, largest (closest to the camera) first"""
+    return sorted((tuple(int(v) for v in face) for face in faces),
+                  key=lambda face: face[2] * face[3], reverse=True)
@@ -1,13 +1,18 @@
 import cv2
-import numpy as np
 import os
-from datetime import datetime
-import pickle
+import sys
 import tkinter as tk
 from tkinter import ttk, messagebox
-from PIL import Image, ImageTk
-import threading
 from database import AttendanceDatabase
+from face_model import get_model_holder
+from training_service import TrainingService
+from face_pack import FacePack
+from face_detector import DetectionScheduler
+from frame_recognizer import FrameRecognizer
+from frame_display import FrameDisplay
+from frame_pipeline import FramePipeline
+from perf_monitor import get_perf_monitor
+from attendance_sink import get_attendance_sink
 from attendance_page import AttendancePage
 from admin_dashboard import AdminDashboard
 from student_dashboard import StudentDashboard
@@ -22,9 +27,19 @@ class AttendanceSystem:
         # Database
         self.db = AttendanceDatabase()
         
+        # Shared face model
+        self.model = get_model_holder()
+        
+        # Face samples go to faces.pack if it exists (see face_pack.py), else images/
+        self.face_pack = FacePack() if FacePack.exists() else None
+        self.training = TrainingService(self.model, pack_path=self.face_pack.path if self.face_pack else None)
+        
+        # Batched attendance writer (database + CSV mirror)
+        self.sink = get_attendance_sink()
+        
         # Variables
         self.camera_active = False
-        self.cap = None
+        self.pipeline = None
         self.current_mode = None  # 'register' or 'attendance'
         self.registration_name = ""
         self.samples_collected = 0
@@ -34,10 +49,17 @@ class AttendanceSystem:
         
         # Face cascade
         self.face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+        self.detector = DetectionScheduler(self.face_cascade)
+        self.recognizer = FrameRecognizer(self.model, self.detector)
         
         # Create GUI
         self.create_widgets()
         
+        # F2 toggles the performance overlay, F3 profiles the frame worker for 10 seconds
+        self.perf = get_perf_monitor()
+        self.root.bind('<F2>', lambda event: self.perf.toggle_overlay())
+        self.root.bind('<F3>', lambda event: self.perf.request_profile(10.0))
+        
     def create_widgets(self):
         # Title
         title = tk.Label(self.root, text="Face Recognition Attendance System", 
@@ -57,6 +79,7 @@ class AttendanceSystem:
         camera_label.pack(pady=10)
         
         self.video_label = tk.Label(left_frame, bg='black')
+        self.display = FrameDisplay(self.video_label)
         self.video_label.pack(padx=10, pady=10)
         
         # Status label
@@ -303,11 +326,13 @@ class AttendanceSystem:
         
     def start_camera(self):
         self.camera_active = True
-        self.cap = cv2.VideoCapture(0)
+        self.pipeline = FramePipeline(0, detect=self.detector, process=self.process_frame)
+        self.recognizer.reset()
         
-        if not self.cap.isOpened():
+        if not self.pipeline.start():
             messagebox.showerror("Error", "Could not open camera!")
             self.camera_active = False
+            self.pipeline = None
             return
         
         self.status_label.config(text="Camera Active", fg='#2ecc71')
@@ -318,10 +343,13 @@ class AttendanceSystem:
         
     def stop_camera(self):
         self.camera_active = False
-        if self.cap:
-            self.cap.release()
+        if self.pipeline:
+            self.pipeline.stop()
+            self.pipeline = None
+        self.sink.flush()
         
         self.video_label.config(image='', bg='black')
+        self.display.clear()
         self.status_label.config(text="Camera Off", fg='#e74c3c')
         self.stop_btn.config(state=tk.DISABLED)
         self.register_btn.config(state=tk.NORMAL)
@@ -329,34 +357,32 @@ class AttendanceSystem:
         self.current_mode = None
         
     def update_frame(self):
+        """Display the newest processed frame (runs on the Tk thread)"""
+        if not self.camera_active:
+            return
+        
+        self.pipeline.run_ui_callbacks()
         if not self.camera_active:
             return
         
-        ret, frame = self.cap.read()
-        if not ret:
+        if self.pipeline.failed:
             self.stop_camera()
             return
         
-        frame = cv2.flip(frame, 1)
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        faces = self.face_cascade.detectMultiScale(gray, 1.3, 5)
+        frame = self.pipeline.get_latest()
+        if frame is not None:
+            with self.perf.stage('photoimage'):
+                self.display.show(frame)
         
+        if self.camera_active:
+            self.video_label.after(self.display.next_delay(), self.update_frame)
+    
+    def process_frame(self, frame, gray, faces):
+        """Process a frame on the pipeline worker thread"""
         if self.current_mode == 'register':
             self.process_registration(frame, gray, faces)
         elif self.current_mode == 'attendance':
             self.process_attendance(frame, gray, faces)
-        
-        # Convert frame for display
-        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        frame = cv2.resize(frame, (640, 480))
-        img = Image.fromarray(frame)
-        imgtk = ImageTk.PhotoImage(image=img)
-        
-        self.video_label.imgtk = imgtk
-        self.video_label.configure(image=imgtk)
-        
-        if self.camera_active:
-            self.video_label.after(10, self.update_frame)
     
     def process_registration(self, frame, gray, faces):
         face_detected = len(faces) > 0
@@ -371,23 +397,22 @@ class AttendanceSystem:
             # Capture sample at intervals
             if self.frame_count % self.capture_interval == 0 and self.samples_collected < self.samples_needed:
                 x, y, w, h = faces[0]
-                img_name = os.path.join('images', f"{self.registration_name}_{self.samples_collected}.jpg")
-                cv2.imwrite(img_name, gray[y:y+h, x:x+w])
+                if self.face_pack:
+                    self.face_pack.append(self.registration_name, gray[y:y+h, x:x+w])
+                else:
+                    img_name = os.path.join('images', f"{self.registration_name}_{self.samples_collected}.jpg")
+                    cv2.imwrite(img_name, gray[y:y+h, x:x+w])
                 self.samples_collected += 1
                 
                 # Update progress
-                progress = (self.samples_collected / self.samples_needed) * 100
-                self.progress_bar['value'] = progress
-                self.progress_label.config(text=f"Samples: {self.samples_collected}/{self.samples_needed}")
+                self.pipeline.call_soon(self.show_progress, self.samples_collected)
                 
                 # Flash effect
                 cv2.rectangle(frame, (0, 0), (frame.shape[1]-1, frame.shape[0]-1), 
                             (255, 255, 255), 15)
                 
                 if self.samples_collected >= self.samples_needed:
-                    self.stop_camera()
-                    messagebox.showinfo("Success", f"Registration complete!\nCollected {self.samples_needed} samples.")
-                    threading.Thread(target=self.train_model, daemon=True).start()
+                    self.pipeline.call_soon(self.finish_registration)
             
             self.frame_count += 1
         else:
@@ -403,102 +428,87 @@ class AttendanceSystem:
         cv2.putText(frame, status, (10, frame.shape[0] - 20),
                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
     
-    def process_attendance(self, frame, gray, faces):
-        if not os.path.exists('face_recognizer.yml') or not os.path.exists('labels.pkl'):
+    def show_progress(self, samples_collected):
+        progress = (samples_collected / self.samples_needed) * 100
+        self.progress_bar['value'] = progress
+        self.progress_label.config(text=f"Samples: {samples_collected}/{self.samples_needed}")
+    
+    def finish_registration(self):
+        if self.current_mode != 'register':
             return
+        self.stop_camera()
+        messagebox.showinfo("Success", f"Registration complete!\nCollected {self.samples_needed} samples.")
+        self.train_model(self.registration_name)
+    
+    def process_attendance(self, frame, gray, faces):
+        tracks, confirmed = self.recognizer.recognize(gray, faces)
         
-        # Load recognizer
-        recognizer = cv2.face.LBPHFaceRecognizer_create()
-        recognizer.read('face_recognizer.yml')
-        
-        with open('labels.pkl', 'rb') as f:
-            label_dict = pickle.load(f)
-        
-        id_to_name = {v: k for k, v in label_dict.items()}
-        
-        # Create attendance file
-        attendance_file = f'Attendance_{datetime.now().strftime("%Y-%m-%d")}.csv'
-        if not os.path.exists(attendance_file):
-            with open(attendance_file, 'w') as f:
-                f.write("Name,Date,Time\n")
-        
-        # Load marked today
-        marked_today = set()
-        with open(attendance_file, 'r') as f:
-            for line in f:
-                if line.strip() and ',' in line:
-                    marked_today.add(line.split(',')[0])
+        # Mark attendance once per confirmed track
+        for name in confirmed:
+            if self.sink.mark_name(name)[0]:
+                self.pipeline.call_soon(self.status_label.config, text=f"Attendance marked: {name}")
         
-        for (x, y, w, h) in faces:
-            face_region = gray[y:y+h, x:x+w]
-            id_, confidence = recognizer.predict(face_region)
-            
-            if confidence < 100:
-                name = id_to_name.get(id_, "Unknown")
+        for track in tracks:
+            x, y, w, h = track.box
+            if track.confirmed:
                 color = (0, 255, 0)
-                
-                # Mark attendance
-                if name != "Unknown" and name not in marked_today:
-                    with open(attendance_file, 'a') as f:
-                        now = datetime.now()
-                        f.write(f"{name},{now.strftime('%Y-%m-%d')},{now.strftime('%H:%M:%S')}\n")
-                    marked_today.add(name)
-                    self.status_label.config(text=f"Attendance marked: {name}")
+            elif track.name != "Unknown":
+                color = (0, 200, 255)
             else:
-                name = "Unknown"
                 color = (0, 0, 255)
             
+            distance = track.distance if track.distance is not None else 999
             cv2.rectangle(frame, (x, y), (x+w, y+h), color, 2)
             cv2.rectangle(frame, (x, y+h-35), (x+w, y+h), color, cv2.FILLED)
-            cv2.putText(frame, f"{name} ({int(confidence)})", (x+6, y+h-6),
+            cv2.putText(frame, f"{track.name} ({int(min(distance, 999))})", (x+6, y+h-6),
                        cv2.FONT_HERSHEY_DUPLEX, 0.6, (255, 255, 255), 1)
         
         # Show marked count
-        cv2.putText(frame, f"Marked Today: {len(marked_today)}", (10, 30),
+        cv2.putText(frame, f"Marked Today: {self.sink.marked_count()}", (10, 30),
                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
     
-    def train_model(self):
-        images_path = 'images'
-        if not os.path.exists(images_path):
-            messagebox.showerror("Error", "No images directory found!")
+    def train_model(self, name=None):
+        """Train the model in the background; incrementally for one newly registered person if name is given"""
+        if not self.training.start(name, on_progress=self.show_training_progress,
+                                   on_done=self.training_done, on_error=self.training_failed):
+            messagebox.showwarning("Warning", "Training is already running!")
             return
-        
-        recognizer = cv2.face.LBPHFaceRecognizer_create()
-        
-        faces = []
-        labels = []
-        label_dict = {}
-        current_id = 0
-        
-        for img_name in os.listdir(images_path):
-            img_path = os.path.join(images_path, img_name)
-            img = cv2.imread(img_path, cv2.IMREAD_GRAYSCALE)
-            
-            if img is None:
-                continue
-            
-            name = '_'.join(img_name.split('_')[:-1])
-            
-            if name not in label_dict:
-                label_dict[name] = current_id
-                current_id += 1
-            
-            faces.append(img)
-            labels.append(label_dict[name])
-        
-        if len(faces) == 0:
-            messagebox.showerror("Error", "No faces found for training!")
+        self.retrain_btn.config(state=tk.DISABLED, text="Training...")
+        self.poll_training()
+    
+    def poll_training(self):
+        if self.training.poll():
+            self.root.after(100, self.poll_training)
+        else:
+            self.retrain_btn.config(state=tk.NORMAL, text="Re-train Model")
+    
+    def show_training_progress(self, stage, done, total):
+        # The progress bar belongs to registration while the camera is on
+        if self.camera_active:
             return
-        
-        recognizer.train(faces, np.array(labels))
-        recognizer.save('face_recognizer.yml')
-        
-        with open('labels.pkl', 'wb') as f:
-            pickle.dump(label_dict, f)
-        
-        messagebox.showinfo("Success", f"Model trained with {len(label_dict)} people!")
+        self.progress_frame.pack(pady=10, fill=tk.X, padx=20)
+        if stage == 'loading' and total:
+            self.progress_bar['value'] = done / total * 100
+            self.progress_label.config(text=f"Training: loaded {done}/{total} images")
+        else:
+            self.progress_label.config(text=f"Training: {stage}...")
+    
+    def training_done(self, result):
+        if not self.camera_active:
+            self.progress_frame.pack_forget()
+        messagebox.showinfo("Success", f"Model trained with {result['people']} people!\n"
+                                       f"({result['mode']} training, {result['seconds']:.1f}s)")
+    
+    def training_failed(self, message):
+        if not self.camera_active:
+            self.progress_frame.pack_forget()
+        messagebox.showerror("Error", message)
 
 def main():
+    if '--headless' in sys.argv[1:]:
+        import kiosk
+        return kiosk.main([arg for arg in sys.argv[1:] if arg != '--headless'])
+    
     root = tk.Tk()
     app = AttendanceSystem(root)
     root.mainloop()
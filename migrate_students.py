@@ -7,6 +7,7 @@ Run this once if you have existing registered students
 
 import os
 from database import AttendanceDatabase
+from face_pack import FacePack
 
 def migrate_students():
     """Migrate students from images folder to database"""
@@ -18,13 +19,22 @@ def migrate_students():
     
     db = AttendanceDatabase()
     
+    student_names = set()
+    
+    # Packed dataset keeps names in its index, no directory scan needed
+    if FacePack.exists():
+        student_names.update(FacePack().names())
+    
     # Get list of unique student names from images folder
     if not os.path.exists('images'):
-        print("No 'images' folder found!")
-        return
+        if not student_names:
+            print("No 'images' folder found!")
+            return
+        image_files = []
+    else:
+        image_files = os.listdir('images')
     
-    student_names = set()
-    for img_file in os.listdir('images'):
+    for img_file in image_files:
         if img_file.endswith('.jpg') or img_file.endswith('.png'):
             # Extract name from filename (e.g., "Josh_0.jpg" -> "Josh")
             name = '_'.join(img_file.split('_')[:-1])
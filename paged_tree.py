@@ -0,0 +1,135 @@
+import bisect
+
+
+class PagedTreeview:
+    """Fills a ttk.Treeview page by page as the user scrolls, and refreshes it by diffing.
+    
+    fetch_page(cursor, limit) returns the rows after a keyset cursor (None
+    for the first page); cursor_of(row) gives the cursor of a row, and
+    row_item(row) its (iid, values, tags). The next page is fetched when
+    the view gets within `prefetch` of the end of the loaded rows.
+    refresh() re-reads the loaded range and only touches items that were
+    added, removed, changed or moved.
+    """
+    
+    EMPTY_IID = '__empty__'
+    
+    def __init__(self, tree, scrollbar, fetch_page, cursor_of, row_item, empty_values=(),
+                 page_size=100, prefetch=0.9):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.fetch_page = fetch_page
+        self.cursor_of = cursor_of
+        self.row_item = row_item
+        self.empty_values = empty_values
+        self.page_size = page_size
+        self.prefetch = prefetch
+        self.cursor = None
+        self.exhausted = False
+        self._items = {}
+        self._loading = False
+        
+        self.tree.configure(yscrollcommand=self._on_scroll)
+    
+    def __len__(self):
+        return len(self._items)
+    
+    def _on_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        if not self.exhausted and not self._loading and float(last) >= self.prefetch:
+            # Let Tk finish the current redraw before fetching more rows
+            self._loading = True
+            self.tree.after_idle(self.load_more)
+    
+    def load_more(self):
+        """Append the next page. Returns the number of rows added"""
+        self._loading = False
+        if self.exhausted:
+            return 0
+        rows = self.fetch_page(self.cursor, self.page_size)
+        self.exhausted = len(rows) < self.page_size
+        if rows:
+            self.cursor = self.cursor_of(rows[-1])
+        
+        if self.tree.exists(self.EMPTY_IID):
+            self.tree.delete(self.EMPTY_IID)
+        for row in rows:
+            iid, values, tags = self.row_item(row)
+            self._items[iid] = (values, tags)
+            self.tree.insert("", "end", iid=iid, text="", values=values, tags=tags)
+        self._show_empty()
+        return len(rows)
+    
+    def reload(self):
+        """Drop every item and load the first page again"""
+        self.tree.delete(*self.tree.get_children())
+        self._items = {}
+        self.cursor = None
+        self.exhausted = False
+        self.load_more()
+    
+    def refresh(self):
+        """Re-read the rows loaded so far and apply only the differences to the tree"""
+        limit = max(self.page_size, len(self._items))
+        self.show(self.fetch_page(None, limit), limit)
+    
+    def show(self, rows, limit=None):
+        """Make the tree show rows, fetched elsewhere with fetch_page(None, limit), by diffing"""
+        limit = limit or self.page_size
+        self.exhausted = len(rows) < limit
+        self.cursor = self.cursor_of(rows[-1]) if rows else None
+        
+        items = [self.row_item(row) for row in rows]
+        new_iids = [iid for iid, _, _ in items]
+        new_set = set(new_iids)
+        
+        if self.tree.exists(self.EMPTY_IID):
+            self.tree.delete(self.EMPTY_IID)
+        removed = [iid for iid in self._items if iid not in new_set]
+        if removed:
+            self.tree.delete(*removed)
+        
+        # Rows that stayed only need moving if their relative order changed
+        order = [iid for iid in self.tree.get_children() if iid in new_set]
+        target = [iid for iid in new_iids if iid in self._items]
+        if order != target:
+            self._reorder(order, target)
+        
+        for index, (iid, values, tags) in enumerate(items):
+            old = self._items.get(iid)
+            if old is None:
+                self.tree.insert("", index, iid=iid, text="", values=values, tags=tags)
+            elif old != (values, tags):
+                self.tree.item(iid, values=values, tags=tags)
+        
+        self._items = {iid: (values, tags) for iid, values, tags in items}
+        self._show_empty()
+    
+    def _reorder(self, order, target):
+        """Move the fewest rows so that `order` becomes `target` (a renamed row moves alone)"""
+        # Rows on the longest run that is already in target order stay put
+        position = {iid: i for i, iid in enumerate(order)}
+        tails, tail_index, previous = [], [], {}
+        for k, iid in enumerate(target):
+            i = bisect.bisect_left(tails, position[iid])
+            previous[k] = tail_index[i - 1] if i else None
+            tails[i:i + 1] = [position[iid]]
+            tail_index[i:i + 1] = [k]
+        stable = set()
+        k = tail_index[-1] if tail_index else None
+        while k is not None:
+            stable.add(target[k])
+            k = previous[k]
+        
+        # Place every other row right after the row before it in target order
+        for k, iid in enumerate(target):
+            if iid in stable:
+                continue
+            order.remove(iid)
+            index = order.index(target[k - 1]) + 1 if k else 0
+            order.insert(index, iid)
+            self.tree.move(iid, "", index)
+    
+    def _show_empty(self):
+        if not self._items and not self.tree.exists(self.EMPTY_IID):
+            self.tree.insert("", "end", iid=self.EMPTY_IID, text="", values=self.empty_values)
@@ -0,0 +1,177 @@
+import cProfile
+import io
+import json
+import os
+import pstats
+import threading
+import time
+
+import cv2
+import numpy as np
+
+
+class _NullTimer:
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _StageTimer:
+    __slots__ = ('monitor', 'stage', 'start')
+    
+    def __init__(self, monitor, stage):
+        self.monitor = monitor
+        self.stage = stage
+    
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.monitor.record(self.stage, time.perf_counter() - self.start)
+        return False
+
+
+class PerfMonitor:
+    """Per-stage timings in fixed-size ring buffers, with percentiles, an overlay and cProfile capture.
+    
+    While disabled, stage() returns a shared no-op context manager and
+    record() returns immediately, so instrumented code costs one attribute
+    check per stage. Enable it (or set PERF_MONITOR=1) to start recording.
+    """
+    
+    def __init__(self, enabled=False, size=512, log_path=None, log_interval=10.0):
+        self.enabled = enabled
+        self.overlay = False
+        self.size = size
+        self.log_path = log_path
+        self.log_interval = log_interval
+        self._buffers = {}
+        self._counts = {}
+        self._lock = threading.Lock()
+        self._last_export = time.monotonic()
+        
+        # cProfile capture (runs on the thread that calls profile_tick)
+        self._profile_request = None
+        self._profiler = None
+        self._profile_end = 0.0
+        self._profile_path = None
+    
+    def stage(self, name):
+        """Context manager that records the time spent in a stage"""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _StageTimer(self, name)
+    
+    def record(self, name, seconds):
+        if not self.enabled:
+            return
+        with self._lock:
+            buffer = self._buffers.get(name)
+            if buffer is None:
+                buffer = self._buffers[name] = np.zeros(self.size, dtype=np.float64)
+                self._counts[name] = 0
+            buffer[self._counts[name] % self.size] = seconds
+            self._counts[name] += 1
+    
+    def reset(self):
+        with self._lock:
+            self._buffers = {}
+            self._counts = {}
+    
+    def percentiles(self):
+        """{stage: {'p50', 'p95', 'p99' (ms), 'count'}} over each stage's ring buffer"""
+        with self._lock:
+            samples = {name: self._buffers[name][:min(count, self.size)].copy()
+                       for name, count in self._counts.items() if count}
+            counts = dict(self._counts)
+        result = {}
+        for name, values in samples.items():
+            p50, p95, p99 = np.percentile(values, [50, 95, 99]) * 1000
+            result[name] = {'p50': p50, 'p95': p95, 'p99': p99, 'count': counts[name]}
+        return result
+    
+    def toggle_overlay(self):
+        """Show or hide the overlay; showing it also turns recording on"""
+        self.overlay = not self.overlay
+        if self.overlay:
+            self.enabled = True
+        return self.overlay
+    
+    def overlay_lines(self, fps=None):
+        """Text lines for the overlay, one per stage"""
+        lines = [f"FPS {fps:.1f}"] if fps is not None else []
+        for name, p in sorted(self.percentiles().items()):
+            lines.append(f"{name:<10} p50 {p['p50']:6.1f}  p95 {p['p95']:6.1f}  p99 {p['p99']:6.1f} ms")
+        return lines
+    
+    def draw_overlay(self, frame, fps=None):
+        """Draw the overlay onto a frame in place, if it is shown"""
+        if not self.overlay:
+            return
+        lines = self.overlay_lines(fps)
+        height = 18 * len(lines) + 8
+        cv2.rectangle(frame, (0, 0), (frame.shape[1], height), (0, 0, 0), cv2.FILLED)
+        for i, line in enumerate(lines):
+            cv2.putText(frame, line, (6, 18 + 18 * i), cv2.FONT_HERSHEY_PLAIN, 1.0, (255, 255, 0), 1)
+    
+    def maybe_export(self):
+        """Append rolling percentiles to log_path as a JSON line every log_interval seconds"""
+        if not self.enabled or not self.log_path:
+            return False
+        now = time.monotonic()
+        if now - self._last_export < self.log_interval:
+            return False
+        self._last_export = now
+        record = {'time': time.strftime('%Y-%m-%dT%H:%M:%S'), 'stages': self.percentiles()}
+        with open(self.log_path, 'a') as f:
+            f.write(json.dumps(record) + "\n")
+        return True
+    
+    def request_profile(self, seconds=10.0, path='perf_profile.prof'):
+        """Ask the instrumented loop to run cProfile for the next `seconds`"""
+        self._profile_request = (seconds, path)
+    
+    def profile_tick(self):
+        """Start or finish a requested cProfile capture. Call once per loop iteration"""
+        if self._profiler is None:
+            if self._profile_request is None:
+                return
+            seconds, self._profile_path = self._profile_request
+            self._profile_request = None
+            self._profile_end = time.monotonic() + seconds
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+            print(f"Profiling for {seconds:g}s...")
+        elif time.monotonic() >= self._profile_end:
+            self._profiler.disable()
+            self._profiler.dump_stats(self._profile_path)
+            out = io.StringIO()
+            pstats.Stats(self._profiler, stream=out).sort_stats('cumulative').print_stats(15)
+            self._profiler = None
+            print(f"Profile saved to {os.path.abspath(self._profile_path)}")
+            print(out.getvalue())
+
+
+_shared_monitor = None
+_shared_lock = threading.Lock()
+
+
+def get_perf_monitor():
+    """Get the monitor shared by all pipelines in this process.
+    
+    PERF_MONITOR=1 enables recording from the start; PERF_LOG=<path> also
+    exports percentiles to that file.
+    """
+    global _shared_monitor
+    with _shared_lock:
+        if _shared_monitor is None:
+            log_path = os.environ.get('PERF_LOG') or None
+            enabled = os.environ.get('PERF_MONITOR', '') not in ('', '0') or log_path is not None
+            _shared_monitor = PerfMonitor(enabled=enabled, log_path=log_path)
+        return _shared_monitor
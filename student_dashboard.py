@@ -1,6 +1,7 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 from database import AttendanceDatabase
+from paged_tree import PagedTreeview
 from datetime import datetime
 
 class StudentDashboard:
@@ -75,6 +76,13 @@ class StudentDashboard:
         
         self.tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         
+        # Records are fetched a page at a time, newest first, as the list is scrolled
+        self.records = PagedTreeview(self.tree, scrollbar,
+                                     lambda before, limit: self.db.get_student_attendance_page(
+                                         self.student_id, before, limit),
+                                     cursor_of=lambda row: row[0], row_item=self.record_item,
+                                     empty_values=("No records", "", ""))
+        
         # Bottom buttons frame
         button_frame = tk.Frame(self.root, bg='#2c3e50')
         button_frame.pack(fill=tk.X, padx=20, pady=15)
@@ -145,28 +153,21 @@ class StudentDashboard:
         tk.Label(total_box, text=str(total), font=("Arial", 20, "bold"), 
                 bg='#ebf5fb', fg='#3498db').pack(pady=(0, 5))
     
+    @staticmethod
+    def record_item(row):
+        """Treeview (iid, values, tags) for an attendance row; one record per date"""
+        date, time_in, status, name = row
+        tag = status.lower() if status in ['present', 'absent', 'late'] else 'present'
+        display_time = time_in if time_in else "N/A"
+        return (str(date), (date, display_time, status), (tag,))
+    
     def load_attendance_data(self):
-        """Load attendance records into treeview"""
-        # Clear existing items
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
-        # Get attendance records
-        records = self.db.get_student_attendance(self.student_id)
-        
-        if not records:
-            self.tree.insert("", "end", text="", values=("No records", "", ""))
-        else:
-            for date, time_in, status, name in records:
-                tag = status.lower() if status in ['present', 'absent', 'late'] else 'present'
-                display_time = time_in if time_in else "N/A"
-                self.tree.insert("", "end", text="", 
-                               values=(date, display_time, status),
-                               tags=(tag,))
+        """Load the first page of attendance records into treeview"""
+        self.records.reload()
     
     def refresh_data(self):
         """Refresh the attendance data"""
-        self.load_attendance_data()
+        self.records.refresh()
         messagebox.showinfo("Success", "Attendance data refreshed!")
     
     def export_to_csv(self):
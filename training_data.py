@@ -0,0 +1,146 @@
+import hashlib
+import os
+import pickle
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+
+class TrainingDataLoader:
+    """Loads grayscale training samples with a thread pool and a decode cache.
+    
+    Decoded samples are stored as .npy files named by the SHA-1 of the image
+    bytes. An index maps each image path to its size, mtime and digest, so an
+    unchanged file is served from the cache (memory-mapped) without being
+    read or decoded again. Changed files are hashed first; if the same bytes
+    were seen before, the cached array is reused.
+    """
+    
+    INDEX_NAME = 'index.pkl'
+    
+    def __init__(self, cache_dir='.face_cache', workers=None):
+        self.cache_dir = cache_dir
+        self.workers = workers or min(8, (os.cpu_count() or 1) + 2)
+        self.index = None
+        self._lock = threading.Lock()
+        
+        # Statistics of the last load
+        self.cache_hits = 0
+        self.decoded = 0
+        self.last_load_time = 0.0
+    
+    def _index_path(self):
+        return os.path.join(self.cache_dir, self.INDEX_NAME)
+    
+    def _array_path(self, digest):
+        return os.path.join(self.cache_dir, f"{digest}.npy")
+    
+    def _load_index(self):
+        if self.index is not None:
+            return
+        self.index = {}
+        try:
+            with open(self._index_path(), 'rb') as f:
+                self.index = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            pass
+    
+    def _save_index(self):
+        tmp_path = self._index_path() + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(self.index, f)
+        os.replace(tmp_path, self._index_path())
+    
+    @staticmethod
+    def normalize(img):
+        """Normalise a decoded sample to a contiguous 2-D uint8 grayscale array"""
+        if img.ndim == 3:
+            img = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        return np.ascontiguousarray(img, dtype=np.uint8)
+    
+    def _load_one(self, path):
+        """Return (array or None, from_cache)"""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None, False
+        key = (st.st_size, st.st_mtime_ns)
+        
+        with self._lock:
+            entry = self.index.get(path)
+        if entry and entry[:2] == key:
+            try:
+                return np.load(self._array_path(entry[2]), mmap_mode='r'), True
+            except (OSError, ValueError):
+                pass
+        
+        with open(path, 'rb') as f:
+            data = f.read()
+        digest = hashlib.sha1(data).hexdigest()
+        array_path = self._array_path(digest)
+        
+        img = None
+        from_cache = False
+        if os.path.exists(array_path):
+            try:
+                img = np.load(array_path, mmap_mode='r')
+                from_cache = True
+            except (OSError, ValueError):
+                img = None
+        
+        if img is None:
+            img = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_GRAYSCALE)
+            if img is None:
+                return None, False
+            img = self.normalize(img)
+            tmp_path = f"{array_path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                np.save(f, img)
+            try:
+                os.replace(tmp_path, array_path)
+            except OSError:
+                # Another worker cached the same bytes and it is mapped (Windows)
+                os.remove(tmp_path)
+        
+        with self._lock:
+            self.index[path] = (st.st_size, st.st_mtime_ns, digest)
+        return img, from_cache
+    
+    def load(self, paths, progress=None, progress_every=50):
+        """Load samples for paths in order; unreadable images come back as None.
+        
+        progress(done, total) is called every progress_every images if given.
+        """
+        start = time.perf_counter()
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._load_index()
+        
+        results = []
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for result in pool.map(self._load_one, paths):
+                results.append(result)
+                if progress and (len(results) % progress_every == 0 or len(results) == len(paths)):
+                    progress(len(results), len(paths))
+        
+        self.cache_hits = sum(1 for img, from_cache in results if from_cache)
+        self.decoded = sum(1 for img, from_cache in results if img is not None and not from_cache)
+        self._save_index()
+        self.last_load_time = time.perf_counter() - start
+        return [img for img, _ in results]
+    
+    def prune(self):
+        """Drop cache entries for images that no longer exist"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._load_index()
+        self.index = {path: entry for path, entry in self.index.items() if os.path.exists(path)}
+        live = {entry[2] for entry in self.index.values()}
+        for file_name in os.listdir(self.cache_dir):
+            if file_name.endswith('.npy') and file_name[:-4] not in live:
+                try:
+                    os.remove(os.path.join(self.cache_dir, file_name))
+                except OSError:
+                    pass
+        self._save_index()
@@ -0,0 +1,106 @@
+import multiprocessing
+import queue
+
+from face_model import get_model_holder
+
+
+def _train_in_process(events, name, images_path, model_path, labels_path, pack_path):
+    """Child process entry point: train and report events over the queue"""
+    from face_pack import FacePack
+    from face_trainer import FaceTrainer
+    
+    def progress(stage, done, total):
+        events.put(('progress', (stage, done, total)))
+    
+    try:
+        pack = FacePack(pack_path) if pack_path else None
+        trainer = FaceTrainer(images_path, model_path, labels_path, pack=pack, progress=progress)
+        result = trainer.train(name)
+        events.put(('done', result))
+    except Exception as e:
+        events.put(('error', str(e)))
+
+
+class TrainingService:
+    """Runs FaceTrainer in a background process and reports back to the UI thread.
+    
+    start() returns immediately. The training process sends progress
+    events over a queue; poll() delivers them to the callbacks on the
+    calling thread, so it is meant to be called from Tk with after().
+    The trainer renames the new files into place when it is done, and the
+    model holder is invalidated so it hot-swaps the new model while
+    attendance keeps using the old one.
+    """
+    
+    def __init__(self, model=None, images_path='images', pack_path=None):
+        self.model = model or get_model_holder()
+        self.images_path = images_path
+        self.pack_path = pack_path
+        self._process = None
+        self._events = None
+        self._callbacks = None
+        self._finished = False
+    
+    def is_running(self):
+        return self._process is not None
+    
+    def start(self, name=None, on_progress=None, on_done=None, on_error=None):
+        """Start training (for one person if name is given). Returns False if training is already running.
+        
+        on_progress(stage, done, total) gets 'loading', 'training', 'saving' and 'indexing';
+        on_done(result) gets the trainer's result dict; on_error(message) a string.
+        """
+        if self.is_running():
+            return False
+        
+        # spawn: forking a process that runs Tk and camera threads is not safe
+        context = multiprocessing.get_context('spawn')
+        self._events = context.Queue()
+        self._callbacks = (on_progress, on_done, on_error)
+        self._finished = False
+        self._process = context.Process(
+            target=_train_in_process, name="face-training", daemon=True,
+            args=(self._events, name, self.images_path, self.model.model_path,
+                  self.model.labels_path, self.pack_path))
+        self._process.start()
+        return True
+    
+    def poll(self):
+        """Deliver queued events to the callbacks. Returns True while training is running"""
+        if self._process is None:
+            return False
+        
+        alive = self._process.is_alive()
+        self._deliver()
+        if alive:
+            return True
+        
+        # The process is gone; pick up anything it sent just before exiting
+        self._process.join()
+        self._deliver()
+        exitcode = self._process.exitcode
+        _, _, on_error = self._callbacks
+        self._process = None
+        if not self._finished and on_error:
+            on_error(f"Training process exited unexpectedly (code {exitcode})")
+        return False
+    
+    def _deliver(self):
+        on_progress, on_done, on_error = self._callbacks
+        while True:
+            try:
+                kind, payload = self._events.get_nowait()
+            except queue.Empty:
+                return
+            if kind == 'progress':
+                if on_progress:
+                    on_progress(*payload)
+            elif kind == 'done':
+                self._finished = True
+                self.model.invalidate()
+                if on_done:
+                    on_done(payload)
+            elif kind == 'error':
+                self._finished = True
+                if on_error:
+                    on_error(payload)